@@ -1,8 +1,12 @@
 #! /usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import re
+
 import xlwings as xw
 
+from functools import lru_cache
+from itertools import chain
 from os import path
 
 from xlwings._xlwindows import App
@@ -10,6 +14,18 @@ from xlwings._xlwindows import COMRetryObjectWrapper
 
 from win32com.client import Dispatch
 
+from xloa.address import Parse
+
+
+# Bounding region of mapping is read in one go when it has no more cells than this, otherwise each column is read
+#  by spans of rows, a span ends where the gap to the next row is larger than __region_gap__
+__region_cells__ = 65536
+__region_gap__ = 256
+
+# Plain A1 reference of a cell, other references, e.g. defined names and columns, are read one by one
+__cell__ = re.compile(r'^\$?[A-Z]{1,3}\$?[1-9][0-9]*$', re.IGNORECASE)
+__columns__ = 16384
+
 
 class Book(object):
     def __init__(self, xls):
@@ -26,8 +42,27 @@ class Book(object):
 
     @staticmethod
     def load_mapping(sheet, expr, separator: str):
-        index = dict(p.split(separator) for p in expr.split(','))
-        return dict(((sheet.range(k).value, sheet.range(v).value) for (k, v) in index.items()))
+        """
+        Read a mapping of cells, e.g. 'A1:B1,A2:B2' maps value of A1 to value of B1 and A2 to B2. Cells are read
+        in one block of their bounding region rather than one by one, or by spans of columns when the region is
+        too large, see parse_mapping. References other than cells, e.g. defined names, are read one by one
+        :param sheet: xlwings Sheet
+        :param expr: pairs of cells split by ',', cells of a pair are split by separator
+        :param separator: separator of cells in a pair
+        :return: dict of values
+        """
+        pairs, regions = parse_mapping(expr, separator)
+
+        values = dict()
+        for (top, left, bottom, right), cells in regions:
+            block = sheet.range((top, left), (bottom, right)).options(ndim=2).value
+            values.update(((r, c), block[r - top][c - left]) for (r, c) in cells)
+
+        for ref in chain.from_iterable(pairs):
+            if isinstance(ref, str) and ref not in values:
+                values[ref] = sheet.range(ref).value
+
+        return dict((values[k], values[v]) for (k, v) in pairs)
 
     @staticmethod
     def dump_column(sheet, column: iter, address: str):
@@ -68,3 +103,45 @@ class Book(object):
             return Book.try_ole('Excel.Application', xls)
         except KeyError as e:
             raise OSError(e)
+
+
+@lru_cache(maxsize=256)
+def parse_mapping(expr: str, separator: str) -> tuple:
+    """
+    Parse expression of mapping, see Book.load_mapping. Result is kept for expressions used again, e.g. the same
+    mapping loaded from every sheet
+    :return: (tuple of pairs, tuple of regions to read), each of a pair is (row, column) of a cell, or the reference
+        itself when it is not a cell; region is ((top, left, bottom, right), cells in it)
+    """
+    index = dict(p.split(separator) for p in expr.split(','))
+    pairs = tuple((_Reference(k), _Reference(v)) for (k, v) in index.items())
+
+    cells = sorted(set(r for r in chain.from_iterable(pairs) if isinstance(r, tuple)), key=lambda c: (c[1], c[0]))
+    if not cells:
+        return pairs, ()
+
+    top, bottom = min(r for (r, _) in cells), max(r for (r, _) in cells)
+    left, right = cells[0][1], cells[-1][1]
+
+    if (bottom - top + 1) * (right - left + 1) <= __region_cells__:
+        return pairs, (((top, left, bottom, right), tuple(cells)), )
+
+    # Cells are sorted by column and then row, a span is cut where column changes or rows are far apart
+    spans = list()
+    for cell in cells:
+        if spans and spans[-1][-1][1] == cell[1] and cell[0] - spans[-1][-1][0] <= __region_gap__:
+            spans[-1].append(cell)
+        else:
+            spans.append([cell])
+
+    return pairs, tuple(((span[0][0], span[0][1], span[-1][0], span[0][1]), tuple(span)) for span in spans)
+
+
+def _Reference(text: str) -> tuple or str:
+    text = text.strip()
+    if __cell__.match(text):
+        row, column = Parse(text)
+        if column <= __columns__:
+            return row, column
+
+    return text
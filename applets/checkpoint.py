@@ -0,0 +1,114 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import hashlib
+import os
+import pickle
+import time
+
+from timber import timber
+
+from applets.spill import SpillIndex
+
+
+class Checkpoint(object):
+    """
+    Checkpoint of a migration run, so a run broken halfway is resumed by a new run with the same parameters rather
+    than started over. Two files are kept in directory, named by hash of parameters:
+        .index  - index of sources, saved once when sources are read; SpillIndex is saved as a copy of its file
+        .ckpt   - state of run, e.g. summary, plan and the next row of target, saved once per interval
+    Files are written into temporary files and then replaced, so a broken checkpoint is never left.
+    :param directory: where checkpoint files are kept
+    :param blob: parameters of run
+    :param interval: min seconds between two saves of state
+    :param clock: clock in seconds, for test
+    """
+    def __init__(self, directory: str, blob: bytes, interval: float = 60.0, clock=time.monotonic):
+        os.makedirs(directory, exist_ok=True)
+
+        name = 'migrate-' + hashlib.sha1(blob).hexdigest()
+        self.Path = os.path.join(directory, name + '.ckpt')
+        self.IndexPath = os.path.join(directory, name + '.index')
+        self.Interval = interval
+
+        self._clock = clock
+        self._saved = clock()
+
+    def Due(self) -> bool:
+        """
+        Whether it's time to save state
+        """
+        return self._clock() - self._saved >= self.Interval
+
+    def Load(self) -> dict or None:
+        """
+        State saved
+        :return: dict, or None when there is no checkpoint or it could not be read
+        """
+        if not os.path.exists(self.Path) or not os.path.exists(self.IndexPath):
+            return None
+
+        try:
+            with open(self.Path, 'rb') as fp:
+                return pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            timber.warning('Checkpoint {0} is not loaded: {1}'.format(self.Path, e))
+            return None
+
+    def Save(self, state: dict):
+        """
+        Save state
+        :param state: dict of state, it must be picklable
+        :return: None
+        """
+        _Replace(self.Path, lambda fp: pickle.dump(state, fp, pickle.HIGHEST_PROTOCOL))
+        self._saved = self._clock()
+
+    def SaveIndex(self, index):
+        """
+        Save index of sources
+        :param index: HashIndex or SpillIndex instance
+        :return: None
+        """
+        if isinstance(index, SpillIndex):
+            index.Backup(self.IndexPath + '.sqlite')
+            _Replace(self.IndexPath, lambda fp: pickle.dump(('spill', None), fp))
+        else:
+            _Replace(self.IndexPath, lambda fp: pickle.dump(('memory', index), fp, pickle.HIGHEST_PROTOCOL))
+
+        timber.info('Index of sources is saved into {0}.'.format(self.IndexPath))
+
+    def LoadIndex(self, directory: str = None):
+        """
+        Index of sources saved
+        :param directory: where SQLite file of SpillIndex is made
+        :return: HashIndex or SpillIndex instance
+        """
+        with open(self.IndexPath, 'rb') as fp:
+            kind, index = pickle.load(fp)
+
+        if kind == 'spill':
+            return SpillIndex(directory, source=self.IndexPath + '.sqlite')
+
+        return index
+
+    def Clear(self):
+        """
+        Remove checkpoint files
+        """
+        for path in (self.Path, self.IndexPath, self.IndexPath + '.sqlite'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                timber.warning('Checkpoint file {0} is not removed: {1}'.format(path, e))
+
+
+def _Replace(path: str, write):
+    temp = path + '.saving'
+    with open(temp, 'wb') as fp:
+        write(fp)
+
+    os.replace(temp, path)
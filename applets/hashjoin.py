@@ -0,0 +1,191 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from timber import timber
+from xloa import Range
+from xloa.address import Encode
+
+from applets.apperror import AppError
+
+
+# Rows read in one call
+__block__ = 5000
+
+# Messages logged for every row, they are sampled by timber.pipe
+row_timber = timber.getLogger('applets.hashjoin.rows')
+
+
+class Layout(object):
+    """
+    Where keys and values are in Worksheet: the header row of <KEY> and <VALUE>, and the columns they span. Data
+    rows follow the header row, up to the last row that has value in columns of keys or values. Rows of UsedRange
+    after it, e.g. cells only formatted or cleared, are not data.
+    """
+    def __init__(self, sht, key_address: str, value_address: str):
+        cell_key = sht.Range(key_address)
+        cell_value = sht.Range(value_address)
+
+        row_key_value = [c.Row for r in (cell_key, cell_value) for c in r]
+        if len(set(row_key_value)) > 1:
+            raise AppError(r'<KEY> and <VALUE> keywords are not in the same row.')
+
+        column_key = sorted([c.Column for c in cell_key])
+        column_value = sorted([c.Column for c in cell_value])
+
+        self.Header = row_key_value[0]
+        self.First = self.Header + 1
+        self.Keys = (column_key[0], column_key[-1])
+        self.Values = (column_value[0], column_value[-1])
+
+        # UsedRange may start below row 1, its last row is not its row count
+        used = sht.UsedRange
+        bottom = used.Row + used.RowCount - 1
+        self.Last = self.First - 1
+        if bottom >= self.First:
+            for first, last in (self.Keys, self.Values):
+                self.Last = max(self.Last, sht.DataExtent(Encode((self.First, first), (bottom, last)))[0])
+
+    def Blocks(self, block: int = __block__):
+        """
+        Split data rows into blocks
+        :return: Generator of (first row, last row)
+        """
+        for first in range(self.First, self.Last + 1, block):
+            yield first, min(first + block - 1, self.Last)
+
+
+def RawBlocks(sht, layout: Layout, block: int = __block__):
+    """
+    Read keys and values in blocks, 2 calls for each block
+    :param sht: Sheet instance
+    :param layout: Layout instance
+    :param block: rows in each block
+    :return: Generator of (first row, key rows, value rows), rows are tuples of cell values as com gives
+    """
+    for first, last in layout.Blocks(block):
+        keys = Range.Matrix(sht.Range(Encode((first, layout.Keys[0]), (last, layout.Keys[1]))).Value)
+        values = Range.Matrix(sht.Range(Encode((first, layout.Values[0]), (last, layout.Values[1]))).Value)
+
+        if last == layout.Last:
+            # Last row found may be a formula that gives '', blank rows at the end are not data
+            keys, values = Range.Trim(keys, values)
+            if not keys:
+                return
+
+        yield first, keys, values
+
+
+def ReadBlocks(sht, layout: Layout, block: int = __block__):
+    """
+    Read keys and values in blocks, see RawBlocks
+    :return: Generator of (first row, key rows, value rows), rows are normalized by Normalize
+    """
+    for first, keys, values in RawBlocks(sht, layout, block):
+        yield first, [Normalize(k) for k in keys], [Normalize(v) for v in values]
+
+
+def Rows(sht, key_address: str, value_address: str):
+    """
+    Read keys and values of data rows
+    :return: Generator of (key, value)
+    """
+    for first, keys, values in ReadBlocks(sht, Layout(sht, key_address, value_address)):
+        yield from zip(keys, values)
+
+
+def Normalize(row: tuple) -> tuple:
+    """
+    Normalize a row of cell values: a single blank cell gives empty tuple, otherwise values are stripped strings
+    and blanks are ''
+    """
+    if len(row) == 1:
+        return (str(row[0]).strip(), ) if row[0] else tuple()
+
+    return tuple(str(v).strip() if v else '' for v in row)
+
+
+class HashIndex(object):
+    """
+    Index of keys to values for migration. The first value of a key wins, and the key is marked redundant when it
+    is found again. Rows without key or value are skipped.
+    :param data: mapping that keeps keys and values, dict by default, or Store for large sources
+    """
+    def __init__(self, data=None):
+        self.Data = dict() if data is None else data
+        self.Redundants = set()
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.Data
+
+    def __getitem__(self, key: tuple) -> tuple:
+        return self.Data[key]
+
+    def __len__(self):
+        return len(self.Data)
+
+    def Add(self, key: tuple, value: tuple) -> bool:
+        """
+        Add a key and its value
+        :return: True when value is taken
+        """
+        if not any(key) or not any(value):
+            return False
+
+        if key in self.Data:
+            self.Redundants.add(key)
+            row_timber.info('Multiple value %s: %s vs %s', key, value, self.Data[key])
+            return False
+
+        self.Data[key] = value
+        return True
+
+    def Extend(self, pairs) -> int:
+        """
+        Add keys and values in order
+        :param pairs: iterable of (key, value)
+        :return: number of values taken
+        """
+        return sum(1 for key, value in pairs if self.Add(key, value))
+
+    def Build(self, sht, key_address: str, value_address: str, block: int = __block__):
+        """
+        Read a source Worksheet block by block into index
+        :param sht: Sheet instance
+        :param key_address: address of key header
+        :param value_address: address of value header
+        :param block: rows in each block
+        :return: Generator of rows read so far, after each block
+        """
+        layout = Layout(sht, key_address, value_address)
+
+        taken = 0
+        for first, keys, values in ReadBlocks(sht, layout, block):
+            taken += self.Extend(zip(keys, values))
+            yield first + len(keys) - layout.First
+
+        timber.info('Find {0} values in rows {1}-{2} of {3}.'.format(taken, layout.First, layout.Last, sht.Name))
+
+    def Lookup(self, keys) -> list:
+        """
+        Look up keys in batch
+        :param keys: iterable of keys
+        :return: list of values, None for keys not found
+        """
+        get = self.Data.get
+        return [get(key) for key in keys]
+
+    def Prefetch(self, keys):
+        """
+        Tell index the keys that are looked up next, e.g. keys of a block of target. Index in memory has nothing
+        to do, see SpillIndex
+        :param keys: iterable of keys
+        :return: None
+        """
+        pass
+
+    def Close(self):
+        """
+        Release what index holds, nothing to do for index in memory
+        """
+        pass
@@ -0,0 +1,98 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import os
+
+from multiprocessing import get_context
+
+from timber import timber
+from xloa import App
+from xloa import Book
+
+from applets.hashjoin import Rows
+
+
+# Files that are read by xloa.xlsx, others are opened by a new Excel instance
+__file_types__ = ('.xlsx', '.xlsm')
+
+
+def Task(book: Book, sheet, key_address: str, value_address: str) -> tuple or None:
+    """
+    Ingestion task of a source, it is worked on by a worker process
+    :param book: Book instance
+    :param sheet: Sheet instance
+    :param key_address: address of key header
+    :param value_address: address of value header
+    :return: (path, sheet name, key address, value address), or None when source must be read in this process, as
+        the Workbook has changes not saved
+    """
+    path = book.FullName
+    if not book.Api.Saved or not os.path.isfile(path):
+        return None
+
+    return path, sheet.Name, key_address, value_address
+
+
+def Ingest(task: tuple or None) -> list or None:
+    """
+    Read a source in worker process, by file backend or by an Excel instance of its own
+    :param task: see Task
+    :return: list of (key, value), or None for task None
+    """
+    if task is None:
+        return None
+
+    path, sheet_name, key_address, value_address = task
+    if os.path.splitext(path)[1].lower() in __file_types__:
+        from xloa.xlsx import Application
+
+        book = Book(App(impl=Application()).Workbooks.Api.Open(path))
+        try:
+            return _Pairs(book.Worksheets[sheet_name], key_address, value_address)
+        finally:
+            book.Api.Close()
+
+    import pythoncom
+    from win32com.client import DispatchEx
+
+    pythoncom.CoInitialize()
+    try:
+        excel = DispatchEx('Excel.Application')
+        excel.Visible = False
+        excel.DisplayAlerts = False
+        try:
+            # UpdateLinks = 0, ReadOnly = True
+            book = Book(excel.Workbooks.Open(path, 0, True))
+            try:
+                return _Pairs(book.Worksheets[sheet_name], key_address, value_address)
+            finally:
+                book.Api.Close(False)
+        finally:
+            excel.Quit()
+    finally:
+        pythoncom.CoUninitialize()
+
+
+def IngestAll(tasks: list, processes: int = None):
+    """
+    Ingest sources in worker processes
+    :param tasks: list of Task
+    :param processes: number of worker processes, by default one for each task up to number of cpus
+    :return: Generator of Ingest results, in order of tasks
+    """
+    count = sum(1 for t in tasks if t is not None)
+    if not count:
+        yield from tasks
+        return
+
+    processes = processes or min(count, os.cpu_count() or 1)
+    timber.info('Ingest {0} sources in {1} processes.'.format(count, processes))
+
+    # Workers are started as new interpreters, as Excel requires on Windows
+    with get_context('spawn').Pool(processes) as pool:
+        yield from pool.imap(Ingest, tasks)
+
+
+def _Pairs(sht, key_address, value_address) -> list:
+    return [(k, v) for k, v in Rows(sht, key_address, value_address) if any(k) and any(v)]
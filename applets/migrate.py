@@ -4,15 +4,30 @@
 
 import json
 import base64
-from functools import wraps
+
+from contextlib import nullcontext
+from itertools import count
 
 from sys import argv
 
 from timber import timber
-from xloa import Range
+from timber import pipe
+from xloa import SheetCache
+from xloa.address import Encode
 
 from applets.xlcontroller import XlController
-from applets.apperror import AppError
+from applets.hashjoin import HashIndex
+from applets.hashjoin import Layout
+from applets.hashjoin import Normalize
+from applets.hashjoin import RawBlocks
+from applets.hashjoin import Rows
+from applets.hashjoin import row_timber as join_timber
+from applets.ingest import IngestAll
+from applets.ingest import Task
+from applets.report import Report
+from applets.store import Store
+from applets.spill import SpillIndex
+from applets.checkpoint import Checkpoint
 
 
 _FILLED_IN_ = '迁移'
@@ -40,46 +55,17 @@ color_values = ((79, 129, 189),         # blue
 
 color_interpreter = dict(zip(color_names, color_values))
 
+# Messages logged for every row, they are sampled by timber.pipe
+row_timber = timber.getLogger('applets.migrate.rows')
 
-def Cells(sht, key_address, value_address):
-    cell_key = sht.Range(key_address)
-    cell_value = sht.Range(value_address)
-
-    row_key_value = [c.Row for r in (cell_key, cell_value) for c in r]
-    if len(set(row_key_value)) > 1:
-        raise AppError(r'<KEY> and <VALUE> keywords are not in the same row.')
-
-    column_key = sorted([c.Column for c in cell_key])
-    column_value = sorted([c.Column for c in cell_value])
-
-    for row in range(row_key_value[0] + 1, sht.UsedRange.Rows.Count + 1):
-        yield ((row, column_key[0]), (row, column_key[-1])), ((row, column_value[0]), (row, column_value[-1]))
-
-
-def for_every_cell(count):
-    def decorator(func):
-
-        @wraps(func)
-        def wrapper(self, sheet, key_addr, value_addr):
-            cycles = 1
-
-            for kc, vc in Cells(sheet, key_addr, value_addr):
-                kr = XlMigrator.Row(sheet, kc)
-                vr = XlMigrator.Row(sheet, vc)
-                key = XlMigrator.Values(kr)
-                value = XlMigrator.Values(vr)
-
-                func(self, key, kr, value, vr)
-
-                if cycles % count == 0:
-                    yield cycles
+# Max messages of every row logged in a second by default
+__row_rate__ = 1000
 
-                cycles += 1
-        return wrapper
-    return decorator
+# Index of sources spills into SQLite file by default when sources have more rows than this
+__spill_rows__ = 2000000
 
 
-@XlController(*argv)
+@XlController(*argv, fast=True)
 class XlMigrator(object):
     def __init__(self, app, sheet):
         self.summary = dict(zip(data_sequence, (0, 0, 0, 0, 0, 0, 0)))
@@ -96,76 +82,284 @@ class XlMigrator(object):
         self.target = param['To']
         self.sources = param['From']
 
+        # Source Worksheets are read from on-disk cache when 'Cache' gives the directory
+        self.cache = SheetCache(param['Cache']) if param.get('Cache') else None
+
+        # Sources are read by worker processes when 'Parallel' is true, or gives the number of processes
+        self.parallel = param.get('Parallel', False)
+
+        # Every decision is streamed into the csv or json lines file of 'Report', and target cells are not colored
+        #  when 'Color' is false, only values are written
+        self.report_path = param.get('Report')
+        self.color = param.get('Color', True)
+        self.report = None
+
+        # Results are reported to VBA once per 'Interval' seconds at most
+        if 'Interval' in param:
+            self.progress.Interval = param['Interval']
+
+        # Messages of every row are sampled by 'Every' and 'Rate' of 'Log', and are also written into json lines file
+        #  when 'JsonLines' gives its path
+        log = param.get('Log', dict())
+        for logger in (row_timber, join_timber):
+            pipe.Sample(logger.name, log.get('Every', 1), log.get('Rate', __row_rate__))
+        if log.get('JsonLines'):
+            pipe.JsonLines(log['JsonLines'])
+
         self.xl_books = dict()
         self.xl_sheets = dict()
+        self.row_counts = dict()
+
+        # Values of sources are kept in a Store when 'Compact' is true, it takes far less memory for sources of
+        #  millions of rows, at the cost of slower lookups
+        self.index = HashIndex(Store() if param.get('Compact') else None)
+        self.data = self.index.Data
+        self.redundants = self.index.Redundants
+
+        # Index of sources spills into a SQLite file in 'SpillDirectory' (temp directory by default) when sources
+        #  have more rows than 'Spill'
+        self.spill_rows = param.get('Spill', __spill_rows__)
+        self.spill_directory = param.get('SpillDirectory')
+
+        # State of run is saved into 'Checkpoint' directory once per 'CheckpointInterval' seconds, a run broken
+        #  halfway is resumed by a new run with the same parameters
+        if param.get('Checkpoint'):
+            self.checkpoint = Checkpoint(param['Checkpoint'], self.parstr, param.get('CheckpointInterval', 60.0))
+        else:
+            self.checkpoint = None
 
-        self.data = dict()
-        self.redundants = set()
+        # Plan of target Worksheet: new values of cells, and cells to color for each term
+        self.changes = dict()
+        self.coloring = dict((term, list()) for term in data_sequence)
 
     def __call__(self, *args, **kwargs):
-        for instruction in self.sources:
-            xls_src = self.GetWorksheet(instruction['book'], instruction['sheet'])
-
-            for cycle in self.Read(xls_src, instruction['key'], instruction['value']):
+        for instruction in self.sources + [self.target]:
+            self.progress.Start(self.RowCount(instruction['book'], instruction['sheet']))
+
+        state = self.Resume() if self.checkpoint else None
+
+        if state is None:
+            rows = sum(self.RowCount(instruction['book'], instruction['sheet']) for instruction in self.sources)
+            if self.spill_rows is not None and rows > self.spill_rows:
+                self.index = SpillIndex(self.spill_directory)
+                self.data = self.index.Data
+                self.redundants = self.index.Redundants
+
+        try:
+            yield from self.Migrate(state)
+        finally:
+            self.index.Close()
+
+    def Migrate(self, state=None):
+        if state is not None:
+            for instruction in self.sources:
+                self.progress.Advance(self.RowCount(instruction['book'], instruction['sheet']))
+        elif self.parallel and len(self.sources) > 1:
+            for source in self.Ingest():
                 yield self.MakeSummary()
+        else:
+            for instruction in self.sources:
+                xls_src = self.GetWorksheet(instruction['book'], instruction['sheet'])
+                if self.cache:
+                    xls_src = self.cache.Open(xls_src)
 
-        xls_tar = self.GetWorksheet(self.target['book'], self.target['sheet'])
-        for cycle in self.Write(xls_tar, self.target['key'], self.target['value']):
-            yield self.MakeSummary()
+                cycles = self.Read(xls_src, instruction['key'], instruction['value'])
+                for cycle in self.Track(cycles, instruction['book'], instruction['sheet']):
+                    yield self.MakeSummary()
 
-    @for_every_cell(10)
-    def Read(self, key, kr, value, vr):
-        if not any(key) or not any(value):
-            return
+        cursor = state['cursor'] if state else 0
+        offset = state['report'] if state else None
 
-        if key in self.data:
-            self.redundants.add(key)
-            timber.info('Multiple value {0}: {1} vs {2}'.format(key, value, self.data[key]))
-            return
+        xls_tar = self.GetWorksheet(self.target['book'], self.target['sheet'])
+        with Report(self.report_path, offset=offset) if self.report_path else nullcontext() as self.report:
+            if self.checkpoint and state is None:
+                self.checkpoint.SaveIndex(self.index)
+                self.Commit(cursor)
+
+            cycles = self.Plan(xls_tar, self.target['key'], self.target['value'], cursor)
+            for cursor in self.Track(cycles, self.target['book'], self.target['sheet']):
+                if self.checkpoint and self.checkpoint.Due():
+                    self.Commit(cursor)
+                yield self.MakeSummary()
 
-        self.data[key] = value
-        timber.info('Find {0}: {1}'.format(key, value))
+            # Apply writes the same cells again when run is broken in it, so the plan is saved before it
+            if self.checkpoint:
+                self.Commit(cursor)
+
+        self.Apply(xls_tar)
+        if self.checkpoint:
+            self.checkpoint.Clear()
+
+        yield self.MakeSummary()
+
+    def Commit(self, cursor):
+        """
+        Save state of run into checkpoint, rows of target before cursor are planned
+        :param cursor: number of rows of target planned
+        """
+        self.checkpoint.Save({
+            'target': self.RowCount(self.target['book'], self.target['sheet']),
+            'cursor': cursor,
+            'summary': dict(self.summary),
+            'changes': self.changes,
+            'coloring': self.coloring,
+            'report': self.report.Offset() if self.report else None,
+        })
+
+    def Resume(self) -> dict or None:
+        """
+        Restore state of run from checkpoint
+        :return: state, or None when there is no checkpoint of the run
+        """
+        state = self.checkpoint.Load()
+        if state is None:
+            return None
+
+        if state['target'] != self.RowCount(self.target['book'], self.target['sheet']):
+            timber.info('Checkpoint {0} is dropped, target is changed.'.format(self.checkpoint.Path))
+            self.checkpoint.Clear()
+            return None
+
+        self.index = self.checkpoint.LoadIndex(self.spill_directory)
+        self.data = self.index.Data
+        self.redundants = self.index.Redundants
+
+        self.summary = state['summary']
+        self.changes = state['changes']
+        self.coloring = state['coloring']
+
+        timber.info('Resume by checkpoint {0}, {1} rows of target are planned.'.format(
+            self.checkpoint.Path, state['cursor']))
+        return state
+
+    def Read(self, sheet, key_addr, value_addr):
+        for rows in self.index.Build(sheet, key_addr, value_addr):
+            yield rows
+
+    def Plan(self, sheet, key_addr, value_addr, start=0):
+        """
+        Work out the outcome of every row of target Worksheet from values read block by block, nothing is written
+        to Worksheet until Apply
+        :param start: number of rows planned already, they are skipped
+        :return: Generator of rows planned so far, after each block
+        """
+        layout = Layout(sheet, key_addr, value_addr)
+        origin = layout.First
+        layout.First = origin + start
+        key_first, key_last = layout.Keys
+        value_first = layout.Values[0]
+
+        for first, keys, values in RawBlocks(sheet, layout):
+            normalized = [Normalize(k) for k in keys]
+            self.index.Prefetch(normalized)
+
+            for row, key, key_cells, value_cells in zip(count(first), normalized, keys, values):
+                vr = [(row, c) for c in range(value_first, value_first + len(value_cells))]
+
+                self.Write(key, ((row, key_first), key_cells), Normalize(value_cells),
+                           [(cell, (v, )) for cell, v in zip(vr, value_cells)])
+
+            yield first + len(keys) - origin
 
-    @for_every_cell(10)
     def Write(self, key, kr, value, vr):
+        """
+        Plan one row of target Worksheet
+        :param key: normalized key of row
+        :param kr: (first key cell, values of key cells)
+        :param value: normalized value of row
+        :param vr: list of (value cell, values of value cell)
+        """
         if not any(key) or key not in self.data:
-            self.UpdateCellRecord(_MISMATCHED_, kr)
+            self.UpdateCellRecord(_MISMATCHED_, key, *kr)
             return
 
         if key in self.redundants:
-            self.UpdateCellRecord(_REDUNDANT_, kr)
+            self.UpdateCellRecord(_REDUNDANT_, key, *kr)
 
         data = self.data[key]
 
         for i in range(len(value)):
-            timber.info('Compare: {0}: <value> {1} vs <new value> {2}, '.format(key, value[i], data[i]))
+            row_timber.info('Compare: %s: <value> %s vs <new value> %s, ', key, value[i], data[i])
 
             if not value[i]:
-                self.UpdateCellRecord(_FILLED_IN_, vr[i + 1], data[i])
+                self.UpdateCellRecord(_FILLED_IN_, key, *vr[i], data[i])
                 return
 
             if data[i] == value[i]:
-                self.UpdateCellRecord(_IGNORED_, vr[i + 1])
+                self.UpdateCellRecord(_IGNORED_, key, *vr[i])
                 return
 
             if self.over_writing:
-                self.UpdateCellRecord(_OVERWRITTEN_, vr[i + 1], data[i])
+                self.UpdateCellRecord(_OVERWRITTEN_, key, *vr[i], data[i])
             else:
-                self.UpdateCellRecord(_DIFFERENT_, vr[i + 1])
+                self.UpdateCellRecord(_DIFFERENT_, key, *vr[i])
+
+    def Apply(self, sheet):
+        """
+        Write the plan into target Worksheet in one go: new values are written by blocks of cells, and cells of
+        each term are colored by one multi-area Range
+        """
+        with sheet.WriteBehind(limit=None) as writer:
+            for cell, data in self.changes.items():
+                writer.SetValue(cell, data)
+
+            for term, cells in self.coloring.items():
+                color_value = color_interpreter[self.color_schema[term]]
+                for cell in cells:
+                    writer.SetColor(cell, color_value)
+
+    def Track(self, cycles, book_name, sheet_name):
+        """
+        Advance progress by rows done of Worksheet, and by the rest of its UsedRange when it is done
+        :param cycles: Generator of rows done so far, e.g. Read, Plan
+        """
+        done = 0
+        for rows in cycles:
+            self.progress.Advance(rows - done)
+            done = rows
+            yield rows
+
+        self.progress.Advance(self.RowCount(book_name, sheet_name) - done)
+
+    def Ingest(self):
+        """
+        Read sources in worker processes, and merge them in order of sources, so the result is the same as Read
+        gives. Sources with changes not saved are read in this process.
+        """
+        tasks = list()
+        for instruction in self.sources:
+            xls_src = self.GetWorksheet(instruction['book'], instruction['sheet'])
+            xls_book = self.xl_books[instruction['book']]
+            tasks.append(Task(xls_book, xls_src, instruction['key'], instruction['value']))
+
+        processes = None if self.parallel is True else int(self.parallel)
+        for instruction, pairs in zip(self.sources, IngestAll(tasks, processes)):
+            if pairs is None:
+                xls_src = self.GetWorksheet(instruction['book'], instruction['sheet'])
+                pairs = Rows(xls_src, instruction['key'], instruction['value'])
 
-    def UpdateCellRecord(self, term, cells, data=None):
+            self.index.Extend(pairs)
+            self.progress.Advance(self.RowCount(instruction['book'], instruction['sheet']))
+            yield instruction
+
+    def UpdateCellRecord(self, term, key, cells, values, data=None):
         self.summary[term] += 1
 
+        if self.report:
+            old = None if term in (_MISMATCHED_, _REDUNDANT_) else values[0]
+            self.report.Write(key, cells[0], cells[1], old, data or None, term)
+
         if not data:
-            value = XlMigrator.Values(cells)
-            if not value:
+            if not Normalize(values):
                 return
         else:
-            cells.Value = data
+            self.changes[cells] = data
 
-        color_name = self.color_schema[term]
-        color_value = color_interpreter[color_name]
-        cells.Color = color_value
+        if self.color:
+            # Cells of key are colored together
+            if len(values) > 1:
+                cells = Encode(cells, (cells[0], cells[1] + len(values) - 1))
+            self.coloring[term].append(cells)
 
     def GetWorksheet(self, book_name, sheet_name):
         book_sheet = (book_name, sheet_name)
@@ -226,39 +420,21 @@ class XlMigrator(object):
         #
         # return summary
 
-    @staticmethod
-    def Row(sheet, coordinates) -> Range:
-        return sheet(*coordinates)
-
-    @staticmethod
-    def Values(cells=None) -> tuple or None:
-        if not cells.Value:
-            return tuple()
-
-        if cells.Count == 1:
-            return str(cells.Value).strip(),
-
-        return tuple(str(v).strip() if v else '' for v in cells.Value[0])
-
-    @staticmethod
-    def Cells(sht, key_addr, value_addr):
-        cell_key = sht.Range(key_addr)
-        cell_value = sht.Range(value_addr)
-
-        row_key_value = [c.Row for r in (cell_key, cell_value) for c in r]
-        if len(set(row_key_value)) > 1:
-            raise AppError(r'<KEY> and <VALUE> keywords are not in the same row.')
-
-        column_key = sorted([c.Column for c in cell_key])
-        column_value = sorted([c.Column for c in cell_value])
+    def RowCount(self, book_name, sheet_name) -> int:
+        """
+        Number of rows in UsedRange of Worksheet, header rows included
+        """
+        book_sheet = (book_name, sheet_name)
+        if book_sheet not in self.row_counts:
+            self.row_counts[book_sheet] = self.GetWorksheet(book_name, sheet_name).UsedRange.Rows.Count
 
-        for row in range(row_key_value[0] + 1, sht.UsedRange.Rows.Count + 1):
-            yield ((row, column_key[0]), (row, column_key[-1])), ((row, column_value[0]), (row, column_value[-1]))
+        return self.row_counts[book_sheet]
 
 
 timber.basicConfig(level=timber.INFO,
                    format='%(asctime)s %(filename)s[line:%(lineno)d] %(levelname)s %(message)s',
                    datefmt='%a, %d %b %Y %H:%M:%S')
 
-migrator = XlMigrator()
-migrator()
+if __name__ == '__main__':
+    migrator = XlMigrator()
+    migrator()
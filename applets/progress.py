@@ -0,0 +1,71 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import time
+
+
+class Progress(object):
+    """
+    Progress of an applet run, reported to VBA no more often than once per interval. Applet tells how many rows
+    there are to work on and how many are done, Progress works out throughput and time left from them:
+        progress.Start(rows)
+        progress.Advance(1000)
+        if progress.Due():
+            call_back(0, json.dumps(progress.Payload(summary)))
+    :param interval: min seconds between two reports
+    :param clock: clock in seconds, for test
+    """
+    def __init__(self, interval: float = 1.0, clock=time.monotonic):
+        self.Interval = interval
+        self.Total = 0
+        self.Done = 0
+
+        self._clock = clock
+        self._start = clock()
+        self._reported = None
+
+    def Start(self, total: int):
+        """
+        Add rows to work on
+        :param total: number of rows
+        :return: None
+        """
+        self.Total += total
+
+    def Advance(self, rows: int):
+        """
+        Add rows done
+        :param rows: number of rows
+        :return: None
+        """
+        self.Done += rows
+
+    def Due(self) -> bool:
+        """
+        Whether it's time to report, the first report is always due
+        """
+        return self._reported is None or self._clock() - self._reported >= self.Interval
+
+    def Payload(self, result: dict) -> dict:
+        """
+        Result of applet with progress added, and mark the time of report
+        :param result: result yielded by applet
+        :return: dict of result, progress is in 'Progress' with rows done, rows in total, rows per second and
+            seconds left (None when it is not known)
+        """
+        now = self._clock()
+        self._reported = now
+
+        elapsed = now - self._start
+        rate = self.Done / elapsed if elapsed > 0 else 0.0
+        eta = max(self.Total - self.Done, 0) / rate if rate > 0 and self.Total else None
+
+        payload = dict(result)
+        payload['Progress'] = {
+            'Rows': self.Done,
+            'Total': self.Total,
+            'RowsPerSecond': round(rate, 1),
+            'ETA': None if eta is None else round(eta, 1),
+        }
+        return payload
@@ -0,0 +1,99 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import csv
+import json
+import os
+
+from timber import timber
+
+from applets.apperror import AppError
+
+
+# Size of file buffer, records are written to disk once buffer is full
+__buffering__ = 1 << 20
+
+__fields__ = ('key', 'row', 'column', 'old', 'new', 'term')
+
+
+class Report(object):
+    """
+    Report of migration, one record for each decision made on target Worksheet, streamed into a csv or json lines
+    file by suffix of path (.csv, .jsonl or .json). Records are written through a buffered file as they come, so
+    report of any size takes little memory:
+        with Report('diff.csv') as report:
+            report.Write(('k1', ), 2, 3, 'a', 'b', '改写')
+    Csv file is in utf-8 with BOM, so that Excel opens it right.
+    :param path: path of report file
+    :param buffering: size of file buffer
+    :param offset: go on with a report written before, it is cut at offset given by Offset, and records are
+        appended after it
+    """
+    def __init__(self, path: str, buffering: int = __buffering__, offset: int = None):
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix not in ('.csv', '.jsonl', '.json'):
+            raise AppError('Report must be a .csv or .jsonl file: {0}'.format(path))
+
+        self.Path = path
+        self.Count = 0
+
+        mode = 'w'
+        if offset is not None and os.path.exists(path):
+            os.truncate(path, offset)
+            mode = 'a'
+
+        if suffix == '.csv':
+            # BOM is written only at the beginning of file
+            self._fp = open(path, mode, encoding='utf-8-sig', newline='', buffering=buffering)
+            self._csv = csv.writer(self._fp)
+            if mode == 'w':
+                self._csv.writerow(__fields__)
+        else:
+            self._fp = open(path, mode, encoding='utf-8', buffering=buffering)
+            self._csv = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.Close()
+
+    def Write(self, key: tuple, row: int, column: int, old, new, term: str):
+        """
+        Write a record
+        :param key: key of row
+        :param row: row of cell
+        :param column: column of cell
+        :param old: value of cell in target, None for cells of key
+        :param new: value written into cell, None when cell is not written
+        :param term: outcome of cell
+        :return: None
+        """
+        if self._csv is not None:
+            self._csv.writerow((' | '.join(key), row, column,
+                                '' if old is None else old, '' if new is None else new, term))
+        else:
+            self._fp.write(json.dumps(dict(zip(__fields__, (key, row, column, old, new, term))),
+                                      ensure_ascii=False, default=str))
+            self._fp.write('\n')
+
+        self.Count += 1
+
+    def Offset(self) -> int:
+        """
+        Flush records, and tell where the file ends
+        :return: size of file in bytes
+        """
+        self._fp.flush()
+        return self._fp.buffer.tell()
+
+    def Close(self):
+        """
+        Flush records and close file
+        """
+        if self._fp.closed:
+            return
+
+        self._fp.close()
+        timber.info('Report {0} records into {1}.'.format(self.Count, self.Path))
@@ -0,0 +1,275 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import os
+import sqlite3
+import tempfile
+
+from collections.abc import Mapping
+
+from timber import timber
+
+from applets.hashjoin import HashIndex
+from applets.hashjoin import row_timber
+
+
+# Rows buffered before they are inserted in one transaction
+__batch__ = 20000
+
+# Max number of keys in one IN (...) lookup, under the limit of host parameters of SQLite
+__chunk__ = 500
+
+# Cells of key or value are joined into one text by unit separator
+__separator__ = '\x1f'
+
+
+class SpillIndex(HashIndex):
+    """
+    Index of keys to values kept in a local SQLite file rather than in memory, for sources too large for memory.
+    It works as HashIndex does, the first value of a key wins and the key is marked redundant when it is found
+    again. Rows added are buffered and inserted by executemany in one transaction for each batch; lookups are made
+    in batch by Prefetch for a block of keys, keys not prefetched are looked up one by one:
+        index = SpillIndex(directory)
+        index.Extend(pairs)
+        index.Prefetch(keys)
+        values = [index.Data[k] for k in keys if k in index.Data]
+    The file is removed on Close.
+    :param directory: where the SQLite file is made, temp directory by default
+    :param batch: rows buffered before they are inserted
+    :param source: SQLite file saved by Backup, index starts as a copy of it
+    """
+    def __init__(self, directory: str = None, batch: int = __batch__, source: str = None):
+        super().__init__(_Data(self))
+        self.Redundants = _Redundants(self)
+
+        fd, self.Path = tempfile.mkstemp(suffix='.sqlite', prefix='migrate-', dir=directory)
+        os.close(fd)
+
+        self._db = sqlite3.connect(self.Path)
+        self._db.executescript('''
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -16384;
+        ''')
+
+        if source:
+            saved = sqlite3.connect(source)
+            try:
+                saved.backup(self._db)
+            finally:
+                saved.close()
+        else:
+            self._db.executescript('''
+                CREATE TABLE data (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+                CREATE TABLE redundant (key TEXT PRIMARY KEY) WITHOUT ROWID;
+            ''')
+
+        self._batch = batch
+        self._count = self._db.execute('SELECT COUNT(*) FROM data').fetchone()[0]
+        self._pending = dict()
+        self._pending_redundants = set()
+
+        # Values and redundant keys of the keys prefetched
+        self._window = set()
+        self._values = dict()
+        self._redundants = set()
+
+        timber.info('Index of sources spills into {0}.'.format(self.Path))
+
+    def __len__(self):
+        return self._count
+
+    def Add(self, key: tuple, value: tuple) -> bool:
+        """
+        Add a key and its value, and insert it at once
+        :return: True when value is taken
+        """
+        return self.Extend(((key, value), )) == 1
+
+    def Extend(self, pairs) -> int:
+        """
+        Add keys and values in order, they are inserted in batch
+        :param pairs: iterable of (key, value)
+        :return: number of values taken
+        """
+        taken = 0
+        for key, value in pairs:
+            if not any(key) or not any(value):
+                continue
+
+            text = __separator__.join(key)
+            if text in self._pending:
+                self._pending_redundants.add(text)
+                row_timber.info('Multiple value %s: %s vs %s', key, value, self._pending[text])
+                continue
+
+            self._pending[text] = __separator__.join(value)
+            if len(self._pending) >= self._batch:
+                taken += self.Flush()
+
+        return taken + self.Flush()
+
+    def Flush(self) -> int:
+        """
+        Insert rows buffered, keys found in file already are marked redundant
+        :return: number of values taken
+        """
+        if not self._pending and not self._pending_redundants:
+            return 0
+
+        pending, self._pending = self._pending, dict()
+        redundants, self._pending_redundants = self._pending_redundants, set()
+
+        existing = self._Fetch('SELECT key, value FROM data WHERE key IN ({0})', list(pending))
+        for text, value in existing:
+            redundants.add(text)
+            row_timber.info('Multiple value %s: %s vs %s', _Split(text), _Split(pending[text]), _Split(value))
+
+        found = set(text for text, _ in existing)
+        rows = [(text, value) for text, value in pending.items() if text not in found]
+
+        with self._db:
+            self._db.executemany('INSERT INTO data (key, value) VALUES (?, ?)', rows)
+            self._db.executemany('INSERT OR IGNORE INTO redundant (key) VALUES (?)', ((k, ) for k in redundants))
+
+        self._count += len(rows)
+        self._window.clear()
+        return len(rows)
+
+    def Prefetch(self, keys):
+        """
+        Look up a block of keys in batch, values and redundant marks of them are kept until next Prefetch
+        :param keys: iterable of keys
+        :return: None
+        """
+        self.Flush()
+
+        texts = list(set(__separator__.join(key) for key in keys if any(key)))
+        self._window = set(texts)
+        self._values = dict(self._Fetch('SELECT key, value FROM data WHERE key IN ({0})', texts))
+        self._redundants = set(k for k, in self._Fetch('SELECT key FROM redundant WHERE key IN ({0})', texts))
+
+    def Lookup(self, keys) -> list:
+        """
+        Look up keys in batch
+        :param keys: list of keys
+        :return: list of values, None for keys not found
+        """
+        self.Prefetch(keys)
+        return [self.Data.get(key) for key in keys]
+
+    def Find(self, key: tuple) -> tuple or None:
+        """
+        Value of key
+        :return: tuple of str, or None when key is not found
+        """
+        self.Flush()
+
+        text = __separator__.join(key)
+        if text in self._window:
+            value = self._values.get(text)
+        else:
+            row = self._db.execute('SELECT value FROM data WHERE key = ?', (text, )).fetchone()
+            value = row and row[0]
+
+        return None if value is None else _Split(value)
+
+    def IsRedundant(self, key: tuple) -> bool:
+        """
+        Whether key is found more than once
+        """
+        self.Flush()
+
+        text = __separator__.join(key)
+        if text in self._window:
+            return text in self._redundants
+
+        return self._db.execute('SELECT 1 FROM redundant WHERE key = ?', (text, )).fetchone() is not None
+
+    def Backup(self, path: str):
+        """
+        Copy the SQLite file, see source of SpillIndex
+        :param path: path of copy
+        :return: None
+        """
+        self.Flush()
+
+        temp = path + '.saving'
+        if os.path.exists(temp):
+            os.remove(temp)
+
+        target = sqlite3.connect(temp)
+        try:
+            self._db.backup(target)
+        finally:
+            target.close()
+
+        os.replace(temp, path)
+
+    def Close(self):
+        """
+        Close and remove the SQLite file
+        """
+        if self._db is None:
+            return
+
+        self._db.close()
+        self._db = None
+        try:
+            os.remove(self.Path)
+        except OSError as e:
+            timber.warning('Index file {0} is not removed: {1}'.format(self.Path, e))
+
+    def _Fetch(self, sql: str, texts: list) -> list:
+        rows = list()
+        for i in range(0, len(texts), __chunk__):
+            chunk = texts[i:i + __chunk__]
+            rows.extend(self._db.execute(sql.format(', '.join('?' * len(chunk))), chunk))
+
+        return rows
+
+
+class _Data(Mapping):
+    """
+    Keys and values of SpillIndex, in the way of HashIndex.Data
+    """
+    def __init__(self, index: SpillIndex):
+        self._index = index
+
+    def __contains__(self, key) -> bool:
+        return self._index.Find(key) is not None
+
+    def __getitem__(self, key: tuple) -> tuple:
+        value = self._index.Find(key)
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        self._index.Flush()
+        for text, in self._index._db.execute('SELECT key FROM data'):
+            yield _Split(text)
+
+
+class _Redundants(object):
+    """
+    Redundant keys of SpillIndex, in the way of HashIndex.Redundants
+    """
+    def __init__(self, index: SpillIndex):
+        self._index = index
+
+    def __contains__(self, key) -> bool:
+        return self._index.IsRedundant(key)
+
+    def __len__(self):
+        self._index.Flush()
+        return self._index._db.execute('SELECT COUNT(*) FROM redundant').fetchone()[0]
+
+
+def _Split(text: str) -> tuple:
+    return tuple(text.split(__separator__))
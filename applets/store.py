@@ -0,0 +1,77 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from array import array
+from collections.abc import Mapping
+
+from applets.apperror import AppError
+
+
+class Store(Mapping):
+    """
+    Compact mapping of keys to values for migration, both are tuples of str. Each distinct str is kept once, and
+    cells are kept as its code in arrays of int:
+        strings - distinct str, code of str is its index
+        values  - codes of values of all rows, one after another
+        offsets - where values of each row start in values, and where the last row ends
+        index   - key to row id, key of single cell is kept as its str, others as tuple of str shared with values
+    Repeated values, e.g. codes of status or names of departments, take 4 bytes for each cell rather than a str.
+    Keys are mostly distinct, so they are not encoded.
+    Rows are only added, a key is never changed or removed once it is in store.
+    """
+    def __init__(self):
+        self._strings = ['']
+        self._codes = {'': 0}
+        self._values = array('I')
+        self._offsets = array('Q', [0])
+        self._index = dict()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        for key in self._index:
+            yield (key, ) if isinstance(key, str) else key
+
+    def __contains__(self, key) -> bool:
+        return (key[0] if len(key) == 1 else key) in self._index
+
+    def __getitem__(self, key: tuple) -> tuple:
+        return self.Row(self._index[key[0] if len(key) == 1 else key])
+
+    def __setitem__(self, key: tuple, value: tuple):
+        if key in self:
+            raise AppError('Key {0} is in store already.'.format(key))
+
+        if len(key) == 1:
+            key = key[0]
+        else:
+            key = tuple(self._strings[self._Intern(k)] for k in key)
+
+        self._index[key] = len(self._offsets) - 1
+        self._values.extend(map(self._Intern, value))
+        self._offsets.append(len(self._values))
+
+    def Row(self, row: int) -> tuple:
+        """
+        Values of row
+        :param row: row id, in order rows are added
+        :return: tuple of str
+        """
+        return tuple(map(self._strings.__getitem__, self._values[self._offsets[row]:self._offsets[row + 1]]))
+
+    @property
+    def Strings(self) -> int:
+        """
+        Number of distinct str in store
+        """
+        return len(self._strings)
+
+    def _Intern(self, text: str) -> int:
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._strings)
+            self._strings.append(text)
+
+        return code
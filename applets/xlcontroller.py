@@ -3,6 +3,8 @@
 
 import json
 
+from contextlib import nullcontext
+
 from pythoncom import com_error
 from timber import timber
 
@@ -13,12 +15,26 @@ from sys import modules
 from xloa import App
 from xloa import XlError
 
+from applets.progress import Progress
+
 
-def XlController(*args):
+def XlController(*args, fast: bool = False, interval: float = 1.0):
+    """
+    Decorate applet class, which is run against the Workbook and Worksheet given by arguments from VBA. Results
+    yielded by applet are reported to VBA once per interval at most, and the last one is always reported. Applet
+    tells its progress through self.progress, see Progress.
+    :param args: command line arguments from VBA
+    :param fast: run applet in App.FastMode, Excel does not repaint, recalculate or fire events while it runs
+    :param interval: min seconds between two reports
+    """
 
     def XlDecorator(cls):
+        # Worker processes of multiprocessing import applet again as __mp_main__, they must not connect to Excel
+        if cls.__module__ == '__mp_main__':
+            return cls
+
         try:
-            app = App()
+            app = App(shared=True)
             xl_book = app.Workbooks[path.basename(args[1])]
             xl_sheet = xl_book.Worksheets[args[5]]
         except com_error as e:
@@ -27,13 +43,26 @@ def XlController(*args):
             timber.exception(e)
 
         def __init__(XlHander):
+            XlHander.progress = Progress(interval)
             cls.__init__(XlHander, app, xl_sheet)
 
         def __call__(XlHandler, *args, **kwargs):
             try:
                 result_call_back = app.Macro('Migration.OnResultCallBack')
-                for result in cls.__call__(XlHandler, *args, **kwargs):
-                    result_call_back(0, json.dumps(result))
+                progress = XlHandler.progress
+                result = None
+                # Whether the latest result is reported already, so that it is not reported twice
+                sent = True
+                with app.FastMode() if fast else nullcontext():
+                    for result in cls.__call__(XlHandler, *args, **kwargs):
+                        sent = progress.Due()
+                        if sent:
+                            # VBA writes progress into cells, they are repainted out of fast mode
+                            with app.FastMode().Paused():
+                                result_call_back(0, json.dumps(progress.Payload(result)))
+
+                if not sent:
+                    result_call_back(0, json.dumps(progress.Payload(result)))
                 ret_value = 0
             except com_error as exp:
                 timber.exception(exp)
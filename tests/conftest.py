@@ -0,0 +1,109 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import zipfile
+
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import pytest
+
+from xloa.address import Encode
+
+
+_CONTENT_TYPES_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_RELS_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<workbookPr date1904="{0}"/><sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+
+_WORKBOOK_RELS_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId2" Target="styles.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+    '</Relationships>'
+)
+
+# Style 1 is built-in date format 14
+_STYLES_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14"/></cellXfs></styleSheet>'
+)
+
+_SHEET_ = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>{0}</sheetData>'
+    '</worksheet>'
+)
+
+
+class Error(str):
+    """
+    Text of error value to be written into file, e.g. Error('#DIV/0!')
+    """
+
+
+def _Cell(row: int, column: int, value, epoch: datetime) -> str:
+    ref = Encode((row, column))
+    if isinstance(value, Error):
+        return '<c r="{0}" t="e"><v>{1}</v></c>'.format(ref, escape(value))
+
+    if isinstance(value, str):
+        return '<c r="{0}" t="inlineStr"><is><t>{1}</t></is></c>'.format(ref, escape(value))
+
+    if isinstance(value, datetime):
+        return '<c r="{0}" s="1"><v>{1!r}</v></c>'.format(ref, (value - epoch).total_seconds() / 86400)
+
+    return '<c r="{0}"><v>{1!r}</v></c>'.format(ref, value)
+
+
+@pytest.fixture
+def xlsx(tmp_path):
+    """
+    Factory of .xlsx files of one Worksheet 'Sheet1', with date style 1 and values given by rows
+    """
+    def make(rows, name: str = 'data.xlsx', date1904: bool = False) -> str:
+        epoch = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+        body = ''.join('<row r="{0}">{1}</row>'.format(r, ''.join(
+            _Cell(r, c, v, epoch) for c, v in enumerate(row, 1) if v is not None)) for r, row in enumerate(rows, 1))
+
+        path = str(tmp_path / name)
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('[Content_Types].xml', _CONTENT_TYPES_)
+            z.writestr('_rels/.rels', _RELS_)
+            z.writestr('xl/workbook.xml', _WORKBOOK_.format(int(date1904)))
+            z.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_)
+            z.writestr('xl/styles.xml', _STYLES_)
+            z.writestr('xl/worksheets/sheet1.xml', _SHEET_.format(body))
+
+        return path
+
+    return make
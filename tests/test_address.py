@@ -0,0 +1,123 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import pickle
+
+from array import array
+
+import pytest
+
+from xloa.address import Address
+from xloa.address import Decode
+from xloa.address import DecodeMany
+from xloa.address import EncodeMany
+from xloa.address import Int2Letter26
+from xloa.address import Letter2Int26
+from xloa.address import Parse
+from xloa.xlerror import XlError
+
+
+@pytest.mark.parametrize('text, coords', [
+    ('a1', ((1, 1), )),
+    ('$B$2', ((2, 2), )),
+    ('$b$2:c3', ((2, 2), (3, 3))),
+    ('XFD1048576', ((1048576, 16384), )),
+    ('A:B', ((None, 1), (None, 2))),
+    ('2:3', ((2, None), (3, None))),
+])
+def test_decode_normalises_case_and_dollars(text, coords):
+    assert Decode(text) == coords
+
+
+def test_parse_rejects_malformed_unit():
+    with pytest.raises(XlError):
+        Parse('A1B2')
+
+
+def test_address_is_interned_and_normalised():
+    assert Address('a1') is Address('$A$1')
+    assert Address('b2:c3') is Address(matrix=((2, 2), (3, 3)))
+    assert Address('$B$2:$C$3').Address == 'B2:C3'
+    assert {Address('B2:C3'): 1}[Address('b2:c3')] == 1
+    assert Address('A1') != Address('A1:A2')
+    assert pickle.loads(pickle.dumps(Address('B2:C3'))) is Address('B2:C3')
+
+
+def test_address_is_immutable():
+    addr = Address('B2:C3')
+
+    with pytest.raises(XlError):
+        addr._row = 3
+
+    with pytest.raises(XlError):
+        del addr._row
+
+
+def test_resize_returns_new_address():
+    addr = Address('B2:C3')
+
+    rows = addr.Resize(rows=(2, 10))
+    columns = addr.Resize(columns=(1, 5))
+
+    assert rows.Address == 'B2:C10' and columns.Address == 'A2:E3'
+    assert addr.Address == 'B2:C3' and addr.Coordinates == (2, 2, 3, 3)
+    assert addr.Resize() is addr
+
+
+@pytest.mark.parametrize('text, absolute', [
+    ('B2:C3', '$B$2:$C$3'),
+    ('A:C', '$A:$C'),
+    ('2:3', '$2:$3'),
+    ('A1:XFD2', '$1:$2'),
+    ('A:XFD', '$1:$1048576'),
+])
+def test_absolute_as_excel_gives(text, absolute):
+    assert Address(text).Absolute == absolute
+
+
+def test_column_letters_bounds():
+    assert (Int2Letter26(1), Int2Letter26(26), Int2Letter26(27), Int2Letter26(16384)) == ('A', 'Z', 'AA', 'XFD')
+    assert (Letter2Int26('a'), Letter2Int26('AA'), Letter2Int26('xfd')) == (1, 27, 16384)
+    assert Letter2Int26(Int2Letter26(16385)) == 16385
+
+    with pytest.raises(XlError):
+        Int2Letter26(0)
+
+
+def test_encode_decode_many_round_trip():
+    rows = array('i', (r for r in range(1, 201) for _ in range(50)))
+    columns = array('i', (c for _ in range(200) for c in (1, 26, 27, 702, 703, 16384) * 8 + (5, 6)))
+
+    addresses = EncodeMany(rows, columns)
+    assert addresses[:3] == ['A1', 'Z1', 'AA1']
+    assert DecodeMany(addresses) == (rows, columns)
+    assert DecodeMany(['$a$1', 'xfd3']) == (array('i', [1, 3]), array('i', [1, 16384]))
+    assert EncodeMany([], []) == [] and DecodeMany([]) == (array('i'), array('i'))
+
+
+@pytest.mark.parametrize('call', [
+    lambda: EncodeMany([1, 2], [1]),
+    lambda: EncodeMany([0], [1]),
+    lambda: EncodeMany([1], [16385]),
+    lambda: DecodeMany('A1'),
+    lambda: DecodeMany(['A1:B2']),
+    lambda: DecodeMany(['A0']),
+    lambda: DecodeMany(['XFE1']),
+])
+def test_many_rejects_invalid(call):
+    with pytest.raises(XlError):
+        call()
+
+
+def test_repeated_addresses_are_parsed_once():
+    # Regression guard of the hot path, the same text must not be parsed again
+    Decode.cache_clear()
+    Parse.cache_clear()
+
+    for _ in range(1000):
+        Address('$K$7:$M$9')
+        Decode('K7:M9')
+
+    assert Decode.cache_info().misses == 2
+    assert Parse.cache_info().misses == 4
@@ -0,0 +1,68 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import pytest
+
+pytest.importorskip('xlwings._xlwindows')
+
+from xloa.address import Parse
+
+from applets.book import Book
+from applets.book import parse_mapping
+
+
+class _Range(object):
+    def __init__(self, sheet, first, last=None):
+        self._sheet = sheet
+        self._first = first
+        self._last = last or first
+
+    def options(self, ndim: int = None):
+        return self
+
+    @property
+    def value(self):
+        self._sheet.reads.append(self._first)
+        if isinstance(self._first, str):
+            if self._first in self._sheet.names:
+                return self._sheet.names[self._first]
+            row, column = Parse(self._first)
+            if row is None:
+                return [self._sheet.cells.get((r, column)) for r in range(1, 4)]
+            return self._sheet.cells.get((row, column))
+
+        (top, left), (bottom, right) = self._first, self._last
+        return [[self._sheet.cells.get((r, c)) for c in range(left, right + 1)] for r in range(top, bottom + 1)]
+
+
+class _Sheet(object):
+    """
+    Sheet of xlwings with cells and defined names in dict
+    """
+    def __init__(self, cells: dict, names: dict = None):
+        self.cells = cells
+        self.names = names or dict()
+        self.reads = list()
+
+    def range(self, first, last=None):
+        return _Range(self, first, last)
+
+
+def test_cells_are_read_in_one_block():
+    sheet = _Sheet({(1, 1): 'a', (1, 2): 1, (2, 1): 'b', (2, 2): 2})
+    assert Book.load_mapping(sheet, 'A1:B1,$A$2:$B$2', ':') == {'a': 1, 'b': 2}
+    assert len(sheet.reads) == 1
+
+
+def test_defined_name_is_read_by_name():
+    sheet = _Sheet({(1, 1): 'a', (1, 2): 'b'}, names={'TOTAL': 100, 'Rate': 0.5})
+    assert parse_mapping('A1:TOTAL', ':')[0] == (((1, 1), 'TOTAL'), )
+    assert Book.load_mapping(sheet, 'A1:TOTAL, B1 : Rate', ':') == {'a': 100, 'b': 0.5}
+    assert sorted(r for r in sheet.reads if isinstance(r, str)) == ['Rate', 'TOTAL']
+
+
+def test_column_reference_is_read_as_range():
+    sheet = _Sheet({(1, 1): 'a', (1, 3): 'x', (2, 3): 'y'})
+    assert parse_mapping('A1=C:C', '=') == ((((1, 1), 'C:C'), ), (((1, 1, 1, 1), ((1, 1), )), ))
+    assert Book.load_mapping(sheet, 'A1=C:C', '=') == {'a': ['x', 'y', None]}
@@ -0,0 +1,26 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import pytest
+
+from xloa.emulator import Application
+
+
+@pytest.fixture
+def worksheet():
+    return Application().Workbooks.Add().Worksheets(1)
+
+
+@pytest.mark.parametrize('get, expected', [
+    (lambda ws: ws.Cells, '$1:$1048576'),
+    (lambda ws: ws.Columns(3), '$C:$C'),
+    (lambda ws: ws.Rows(2), '$2:$2'),
+    (lambda ws: ws.Range('A:B'), '$A:$B'),
+    (lambda ws: ws.Range('3:5'), '$3:$5'),
+    (lambda ws: ws.Range('A1:B2,D:D'), '$A$1:$B$2,$D:$D'),
+    (lambda ws: ws.Range('B2:C3').Rows(1), '$B$2:$C$2'),
+    (lambda ws: ws.Range('C2:C1048576'), '$C$2:$C$1048576'),
+])
+def test_address_as_excel_gives(worksheet, get, expected):
+    assert get(worksheet).Address == expected
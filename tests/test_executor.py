@@ -0,0 +1,109 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from xloa import App
+from xloa import XlError
+from xloa import executor
+from xloa.emulator import Application
+from xloa.executor import ComExecutor
+
+
+def _Book(app: App):
+    sheet = app.Workbooks.Api.Add('data.xlsx').Worksheets(1)
+    for row in range(1, 7):
+        sheet._Set(row, 1, row)
+
+
+@pytest.fixture
+def com():
+    with ComExecutor(connect=lambda: App(impl=Application())) as com:
+        com.Submit(_Book).result()
+        yield com
+
+
+def test_calls_are_made_in_order_on_the_thread(com):
+    made = list()
+    futures = [com.Submit(lambda app, i: made.append((i, threading.current_thread().name)), i) for i in range(100)]
+    for future in futures:
+        future.result()
+
+    assert made == [(i, 'xloa-com') for i in range(100)]
+    assert asyncio.run(com.read_range('data.xlsx', 'Sheet1', 'A1:A2')) == ((1, ), (2, ))
+
+
+def test_exception_is_given_by_future(com):
+    def fail(app):
+        raise ValueError('failed')
+
+    with pytest.raises(ValueError):
+        com.Submit(fail).result()
+
+    with pytest.raises(XlError):
+        asyncio.run(com.read_range('data.xlsx', 'Missing', 'A1'))
+
+    # The thread goes on after exceptions
+    assert com.Submit(lambda app: app.Workbooks.Count).result() == 1
+
+
+def test_next_block_is_read_while_block_is_processed(com, monkeypatch):
+    read = list()
+    reader = executor._Read
+
+    def Read(app, book, sheet, address):
+        read.append(address)
+        return reader(app, book, sheet, address)
+
+    monkeypatch.setattr(executor, '_Read', Read)
+
+    async def main():
+        addresses = ('A1:A2', 'A3:A4', 'A5:A6')
+        blocks = list()
+        async for block in com.read_blocks('data.xlsx', 'Sheet1', addresses):
+            # Let the next read be queued, and wait for the calls queued before
+            await asyncio.sleep(0)
+            await com.call(lambda app: None)
+            blocks.append((block, list(read)))
+
+        return blocks
+
+    assert asyncio.run(main()) == [
+        (((1, ), (2, )), ['A1:A2', 'A3:A4']),
+        (((3, ), (4, )), ['A1:A2', 'A3:A4', 'A5:A6']),
+        (((5, ), (6, )), ['A1:A2', 'A3:A4', 'A5:A6']),
+    ]
+
+
+def test_close_leaves_no_call_behind():
+    com = ComExecutor(connect=lambda: App(impl=Application()))
+    futures = list()
+    start = threading.Barrier(5)
+
+    def submit():
+        start.wait()
+        try:
+            while True:
+                futures.append(com.Submit(lambda app: None))
+        except XlError:
+            pass
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    while len(futures) < 1000:
+        time.sleep(0.001)
+    com.Close()
+    for thread in threads:
+        thread.join()
+
+    # Every call queued is done, none is left after the thread stops
+    assert futures and all(future.done() for future in futures)
+    with pytest.raises(XlError):
+        com.Submit(lambda app: None)
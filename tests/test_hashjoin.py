@@ -0,0 +1,22 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from xloa import App
+from xloa.emulator import Application
+
+from applets.hashjoin import Layout
+
+
+def test_layout_reaches_last_row_of_used_range():
+    app = App(impl=Application())
+    api = app.Workbooks.Api.Add('data.xlsx').Worksheets(1)
+    # Table starts at row 3, so the row count of UsedRange is less than its last row
+    api._Set(3, 1, 'key')
+    api._Set(3, 2, 'value')
+    for row in range(4, 14):
+        api._Set(row, 1, 'k{0}'.format(row))
+        api._Set(row, 2, row)
+
+    layout = Layout(app.Workbooks['data.xlsx'].Worksheets['Sheet1'], 'A3', 'B3')
+    assert (layout.First, layout.Last) == (4, 13)
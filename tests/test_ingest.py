@@ -0,0 +1,43 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from datetime import datetime
+from datetime import timezone
+
+from conftest import Error
+from xloa import App
+from xloa.constants import CVError
+from xloa.emulator import Application
+from xloa.emulator import ErrorValue
+
+from applets.hashjoin import Rows
+from applets.ingest import Ingest
+
+
+def test_worker_reads_as_com(xlsx):
+    path = xlsx((
+        ('key', 'value'),
+        (datetime(2024, 3, 1), 'date key'),
+        ('date value', datetime(2024, 3, 1, 12)),
+        ('div', Error('#DIV/0!')),
+        ('na', Error('#N/A')),
+    ))
+
+    # The same cells as com object gives them: dates in UTC, errors in int
+    app = App(impl=Application())
+    sheet = app.Workbooks.Api.Add('data.xlsx').Worksheets(1)
+    sheet.Range('A1:B5').Value = (
+        ('key', 'value'),
+        (datetime(2024, 3, 1, tzinfo=timezone.utc), 'date key'),
+        ('date value', datetime(2024, 3, 1, 12, tzinfo=timezone.utc)),
+        ('div', ErrorValue(CVError.xlErrDiv0)),
+        ('na', ErrorValue(CVError.xlErrNA)),
+    )
+    sequential = list(Rows(app.Workbooks['data.xlsx'].Worksheets['Sheet1'], 'A1', 'B1'))
+
+    assert Ingest((path, 'Sheet1', 'A1', 'B1')) == sequential
+    assert sequential[:2] == [
+        (('2024-03-01 00:00:00+00:00', ), ('date key', )),
+        (('date value', ), ('2024-03-01 12:00:00+00:00', )),
+    ]
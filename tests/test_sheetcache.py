@@ -0,0 +1,80 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from xloa import App
+from xloa import Sheet
+from xloa.emulator import Application
+from xloa.sheetcache import SheetCache
+
+
+def test_cached_date_is_read_as_live(tmp_path):
+    path = tmp_path / 'data.xlsx'
+    path.write_bytes(b'')
+
+    app = App(impl=Application())
+    sheet = Sheet(app.Workbooks.Api.Open(str(path)).Worksheets(1))
+    # Dates given by com are in time zone, naive dates are written by file backends
+    sheet.Range('A1:C2').Value = (
+        ('date', 'zoned', 'naive'),
+        (datetime(2024, 3, 1, 8, 30, tzinfo=timezone.utc),
+         datetime(2024, 3, 1, 8, 30, tzinfo=timezone(timedelta(hours=8))),
+         datetime(2024, 3, 1, 8, 30)),
+    )
+
+    live = sheet.Range('A1:C2').Value
+    cached = SheetCache(str(tmp_path / 'cache')).Open(sheet)
+    assert cached is not sheet
+
+    values = cached.Range('A1:C2').Value
+    assert values == live
+    assert [str(v) for v in values[1]] == [str(v) for v in live[1]]
+    assert [v.utcoffset() for v in values[1]] == [v.utcoffset() for v in live[1]]
+
+
+def _Cached(tmp_path, values):
+    path = tmp_path / 'data.xlsx'
+    path.write_bytes(b'')
+
+    app = App(impl=Application())
+    sheet = Sheet(app.Workbooks.Api.Open(str(path)).Worksheets(1))
+    sheet.Range('A1:B2').Value = values
+    return sheet, SheetCache(str(tmp_path / 'cache'))
+
+
+def test_blank_text_is_cached_as_it_is(tmp_path):
+    sheet, cache = _Cached(tmp_path, (('a', ''), ('', 1)))
+    # Emulator keeps no blank text, as Excel gives it for formulas such as =""
+    sheet.Api._cells[(1, 2)] = ''
+
+    live = sheet.Range('A1:B2').Value
+    assert live == (('a', ''), (None, 1))
+    assert cache.Open(sheet).Range('A1:B2').Value == live
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: b'',
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:8] + b'{broken' + data[15:],
+    lambda data: data[:4] + b'\xff\xff\x00\x00' + data[8:],
+])
+def test_broken_cache_file_is_read_again(tmp_path, damage):
+    sheet, cache = _Cached(tmp_path, (('a', 1), ('b', 2)))
+    cache.Open(sheet)
+
+    path = cache.Path(sheet)
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    with open(path, 'wb') as fp:
+        fp.write(damage(data))
+
+    assert cache.Load(path, SheetCache.Fingerprint(sheet)) is None
+    cached = cache.Open(sheet)
+    assert cached is not sheet
+    assert cached.Range('A1:B2').Value == (('a', 1), ('b', 2))
@@ -0,0 +1,164 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import pytest
+
+from xloa import App
+from xloa import Range
+from xloa import XlError
+from xloa.address import Address
+from xloa.emulator import Application
+
+
+class _Com(object):
+    """
+    Stand-in com object of Range, it records the calls made on it, and knows the Address of defined names
+    """
+    def __init__(self, address: str, calls: list, names: dict = None):
+        self._address = address
+        self._calls = calls
+        self._names = names or dict()
+
+    @property
+    def Address(self):
+        self._calls.append('Address')
+        return self._address
+
+    def Range(self, reference):
+        self._calls.append('Range')
+        if reference in self._names:
+            return _Com(self._names[reference], self._calls)
+
+        # Relative to this Range, as com object does
+        top, left, _, _ = Address(addr=self._address).Coordinates
+        row, column, last_row, last_column = Address(addr=reference).Coordinates
+        return _Com(Address.Of(top + row - 1, left + column - 1, top + last_row - 1, left + last_column - 1).Absolute,
+                    self._calls)
+
+
+@pytest.fixture
+def sheet():
+    app = App(impl=Application())
+    app.Workbooks.Add()
+    return app.ActiveSheet
+
+
+@pytest.mark.parametrize('address, expected, rows, columns', [
+    ('A:B', '$A:$B', 1048576, 2),
+    ('C:C', '$C:$C', 1048576, 1),
+    ('2:3', '$2:$3', 2, 16384),
+    ('5:5', '$5:$5', 1, 16384),
+])
+def test_whole_column_and_row_address(sheet, address, expected, rows, columns):
+    rng = sheet.Range(address)
+    assert rng.Address == expected
+    assert (rng.RowCount, rng.ColumnCount) == (rows, columns)
+
+
+def test_whole_column_and_row_of_sheet(sheet):
+    assert sheet.Columns(3).Address == '$C:$C'
+    assert sheet.Rows(2).Address == '$2:$2'
+    assert sheet.Columns(3).Api.Address == '$C:$C'
+
+
+@pytest.mark.parametrize('reference, address, row, column', [
+    ('A1', '$C$3', 3, 3),
+    ('$B$2:C4', '$D$4:$E$6', 4, 4),
+])
+def test_plain_reference_is_located_without_com_call(reference, address, row, column):
+    calls = list()
+    parent = Range(_Com('$C$3:$Z$100', calls))
+    parent.Location
+
+    calls.clear()
+    rng = parent.Range(reference)
+    assert (rng.Row, rng.Column, rng.Address) == (row, column, address)
+    assert calls == ['Range']
+
+
+@pytest.mark.parametrize('reference, address, row, column', [
+    ('Rate_2', '$D$4', 4, 4),
+    ('DATA2023', '$B$2:$C$9', 2, 2),
+    ('Tax_2_rate', '$F$1', 1, 6),
+    ('Sheet1!A1', '$A$1', 1, 1),
+    ('XFE1', '$G$7', 7, 7),
+    ('A:C', '$A:$C', 1, 1),
+])
+def test_other_reference_is_left_to_com(reference, address, row, column):
+    calls = list()
+    names = {'Rate_2': '$D$4', 'DATA2023': '$B$2:$C$9', 'Tax_2_rate': '$F$1', 'Sheet1!A1': '$A$1',
+             'XFE1': '$G$7', 'A:C': '$A:$C'}
+    parent = Range(_Com('$C$3:$Z$100', calls, names))
+    parent.Location
+
+    calls.clear()
+    rng = parent.Range(reference)
+    assert (rng.Row, rng.Column, rng.Address) == (row, column, address)
+    assert calls == ['Range', 'Address']
+
+
+def test_named_lookup_is_not_stale():
+    impl = Application()
+    app = App(impl=impl)
+    api = app.Workbooks.Api.Add('data.xlsx')
+
+    book = app.Workbooks['data.xlsx']
+    sheet = book.Worksheets['Sheet1']
+    calls = impl.Calls
+
+    # Lookups again are dictionary hits
+    assert app.Workbooks['DATA.xlsx'] is book
+    assert app.Workbooks['data.xlsx'].Worksheets['sheet1'] is sheet
+    assert impl.Calls == calls
+
+    # Renamed through the wrapper
+    sheet.Name = 'Renamed'
+    assert book.Worksheets['Renamed'] is sheet
+
+    # Closed and opened again in Excel, the wrapper is dropped by the first com call that fails through it
+    api.Close()
+    app.Workbooks.Api.Add('data.xlsx')
+    assert app.Workbooks['data.xlsx'] is book
+    with pytest.raises(XlError):
+        sheet.Range('A1').Value
+    reopened = app.Workbooks['data.xlsx']
+    assert reopened is not book
+    assert reopened.Worksheets['Sheet1'].Range('A1').Value is None
+
+
+def test_shared_dispatch_is_resolved_once(monkeypatch):
+    impl = Application()
+    connects = list()
+    monkeypatch.setattr(App, 'Connect', lambda self: connects.append(impl) or impl)
+    App.Disconnect()
+
+    assert App(shared=True).Api is App(shared=True).Api
+    assert len(connects) == 1
+
+    App.Disconnect()
+    App(shared=True)
+    assert len(connects) == 2
+    App.Disconnect()
+
+
+def test_fast_mode_is_paused_for_call_back():
+    impl = Application()
+    app = App(impl=impl)
+    app.Workbooks.Add()
+
+    shown = list()
+    impl.Register('Migration.OnResultCallBack', lambda *args: shown.append(impl.ScreenUpdating))
+
+    with app.FastMode():
+        assert not impl.ScreenUpdating
+        with app.FastMode().Paused():
+            app.Macro('Migration.OnResultCallBack')(0, '{}')
+        assert (impl.ScreenUpdating, impl.EnableEvents, impl.DisplayStatusBar) == (False, False, False)
+
+    assert shown == [True]
+    assert impl.ScreenUpdating
+
+    with app.FastMode().Paused():
+        assert impl.ScreenUpdating
+    assert impl.ScreenUpdating
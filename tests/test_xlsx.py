@@ -0,0 +1,33 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from xloa.xlsx import Application
+
+
+@pytest.mark.parametrize('date1904', [False, True])
+def test_dates_round_trip(xlsx, tmp_path, date1904):
+    # Cells in date style, as dates are read by style
+    path = xlsx([(datetime(2000, 1, 1), datetime(2000, 1, 1), datetime(2000, 1, 1))], date1904=date1904)
+
+    book = Application().Workbooks.Open(path)
+    assert book.Worksheets(1).Range('A1').Value == datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    book.Worksheets(1).Range('A1:C1').Value = (
+        datetime(2024, 3, 1, 8, 30),
+        datetime(2024, 3, 1, 8, 30, tzinfo=timezone.utc),
+        datetime(2024, 3, 1, 8, 30, tzinfo=timezone(timedelta(hours=8))),
+    )
+    book.SaveAs(str(tmp_path / 'saved.xlsx'))
+    book.Close()
+
+    # Excel has no time zone, dates keep the time they show
+    book = Application().Workbooks.Open(str(tmp_path / 'saved.xlsx'))
+    assert book.Worksheets(1).Range('A1:C1').Value == ((datetime(2024, 3, 1, 8, 30, tzinfo=timezone.utc), ) * 3, )
+    book.Close()
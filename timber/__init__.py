@@ -4,6 +4,14 @@
 
 import logging as timber
 
+from .pipeline import Pipeline
+from .pipeline import Sampler
+from .pipeline import JsonFormatter
+
 timber.basicConfig(level=timber.INFO,
                    format='%(asctime)s %(filename)s[line:%(lineno)d] %(levelname)s %(message)s',
                    datefmt='%a, %d %b %Y %H:%M:%S')
+
+# Handlers of root logger write on a background thread, see Pipeline
+pipe = Pipeline()
+pipe.Start()
@@ -0,0 +1,208 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+
+
+class DeferredHandler(QueueHandler):
+    """
+    Put records into queue as they are, message is formatted by the handlers on the writer thread rather than by
+    the thread that logs. Arguments of message are formatted later, so they should not be changed after logging.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class Sampler(logging.Filter):
+    """
+    Sampling of per-row messages, by SampledLogger or as filter of handler. Records with same message template are
+    let through once in every records, and no more than rate records in a second are let through for the logger.
+    Warnings and errors are always let through.
+    :param every: let through 1 of every records of same template
+    :param rate: max records let through in a second, None for no limit
+    """
+    def __init__(self, every: int = 1, rate: float = None):
+        super().__init__()
+        self.Every = max(int(every), 1)
+        self.Rate = rate
+        self.Dropped = 0
+
+        self._counts = dict()
+        self._tokens = rate or 0.0
+        self._time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.Take(record.levelno, record.msg)
+
+    def Take(self, level: int, msg) -> bool:
+        """
+        Whether a record is let through
+        :param level: level of record
+        :param msg: message template of record
+        :return: bool
+        """
+        if level >= logging.WARNING:
+            return True
+
+        with self._lock:
+            seen = self._counts.get(msg, 0)
+            self._counts[msg] = seen + 1
+            if seen % self.Every:
+                self.Dropped += 1
+                return False
+
+            if self.Rate is not None:
+                now = time.monotonic()
+                self._tokens = min(self._tokens + (now - self._time) * self.Rate, self.Rate)
+                self._time = now
+                if self._tokens < 1:
+                    self.Dropped += 1
+                    return False
+                self._tokens -= 1
+
+        return True
+
+
+class SampledLogger(logging.Logger):
+    """
+    Logger that asks its Sampler before record is made, so a record dropped costs little more than a dict lookup
+    """
+    sampler = None
+
+    def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=False, stacklevel=1):
+        if self.sampler is None or self.sampler.Take(level, msg):
+            # One more frame, of this method, is between the caller and Logger._log
+            super()._log(level, msg, args, exc_info, extra, stack_info, stacklevel + 1)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format record into a json line, with time, level, logger, file, line and message
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            'time': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            line['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class Pipeline(object):
+    """
+    Logging pipeline of a logger, root logger by default. Handlers of logger are moved to a background thread, and
+    logger puts records into a queue for them, so writing files and console is off the hot path:
+        pipeline = Pipeline()
+        pipeline.Start()
+        pipeline.JsonLines('run.jsonl')
+        pipeline.Sample('applets.migrate.rows', every=100, rate=50)
+    Records still in queue are written when pipeline is stopped, it is stopped at exit of interpreter.
+    :param logger: logger of pipeline
+    """
+    def __init__(self, logger: logging.Logger = None):
+        self._logger = logger or logging.getLogger()
+        self._queue = queue.SimpleQueue()
+        self._handler = DeferredHandler(self._queue)
+        self._listener = None
+        self._samplers = dict()
+
+    @property
+    def Running(self) -> bool:
+        return self._listener is not None
+
+    def Start(self):
+        """
+        Move handlers of logger to the writer thread, and start it
+        :return: None
+        """
+        if self.Running:
+            return
+
+        handlers = tuple(h for h in self._logger.handlers if h is not self._handler)
+        for handler in handlers:
+            self._logger.removeHandler(handler)
+        self._logger.addHandler(self._handler)
+
+        self._listener = QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.Stop)
+
+    def Stop(self):
+        """
+        Write records in queue, stop the writer thread and give handlers back to logger
+        :return: None
+        """
+        if not self.Running:
+            return
+
+        listener, self._listener = self._listener, None
+        self._logger.removeHandler(self._handler)
+        listener.stop()
+        for handler in listener.handlers:
+            self._logger.addHandler(handler)
+        atexit.unregister(self.Stop)
+
+        for name, sampler in self._samplers.items():
+            if sampler.Dropped:
+                self._logger.info('{0} records of {1} are not logged by sampling.'.format(sampler.Dropped, name))
+
+    def AddHandler(self, handler: logging.Handler):
+        """
+        Add a handler, it is run on the writer thread when pipeline is running
+        :param handler: logging.Handler instance
+        :return: None
+        """
+        if self.Running:
+            self._listener.handlers = self._listener.handlers + (handler, )
+        else:
+            self._logger.addHandler(handler)
+
+    def JsonLines(self, path: str, level: int = logging.NOTSET) -> logging.Handler:
+        """
+        Add a sink that writes records into file, one json object in a line, see JsonFormatter
+        :param path: path of file, records are appended
+        :param level: min level of records written
+        :return: handler of sink
+        """
+        handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setLevel(level)
+        handler.setFormatter(JsonFormatter())
+        self.AddHandler(handler)
+        return handler
+
+    def Sample(self, name: str, every: int = 1, rate: float = None) -> Sampler:
+        """
+        Sample records of a logger, see Sampler. Logger given by name is sampled again when it is sampled already.
+        :param name: name of logger
+        :param every: let through 1 of every records of same template
+        :param rate: max records let through in a second, None for no limit
+        :return: Sampler instance
+        """
+        logger = logging.getLogger(name)
+        if type(logger) is logging.Logger:
+            # Logger is sampled in place, so that it is sampled for modules that got it already
+            logger.__class__ = SampledLogger
+
+        if not isinstance(logger, SampledLogger):
+            raise TypeError('Logger {0} of {1} could not be sampled.'.format(name, type(logger).__name__))
+
+        sampler = Sampler(every, rate)
+        logger.sampler = sampler
+        self._samplers[name] = sampler
+        return sampler
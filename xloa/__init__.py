@@ -13,3 +13,7 @@ from .charts import Chart
 from .charts import Charts
 from .macro import Macro
 from .address import Address
+from .region import Region
+from .profiler import Profiler
+from .sheetcache import SheetCache
+from .executor import ComExecutor
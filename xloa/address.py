@@ -4,84 +4,183 @@
 
 import re
 
+from array import array
+from functools import lru_cache
+from itertools import product
+from operator import add
+
 from .xlerror import XlError
 
 
+# Bound of the parsed address caches, addresses used by a job are far less than this in general
+__cache_size__ = 65536
+
+# Bound of the interned Address instances
+__interned_size__ = 4096
+
+# Rows and columns of a worksheet
+__sheet_rows__ = 1048576
+__sheet_columns__ = 16384
+
+__units__ = re.compile(r'\d+|[A-Z]+')
+__cells__ = re.compile(r'(\d+)\n?')
+
+
 class Address(object):
     """
-    An class that represents relative address expression
+    An class that represents relative address expression. Address is immutable, the coordinates of both endpoints
+    are held as 4 ints, 0 stands for the row or column omitted in expression, e.g. 'A:B' or '1:3'. So Address could
+    be used as key of dict or member of set. Addresses in common use are interned, the same Address instance is
+    returned for the same coordinates.
     """
-    def __init__(self, addr: str = None, matrix: tuple or list = None):
+    __slots__ = ('_row', '_column', '_last_row', '_last_column', '_hash')
+
+    def __new__(cls, addr: str = None, matrix: tuple or list = None):
         if all((addr, matrix)):
             raise XlError('Do not set both add-ref and matrix.')
 
+        coords = ()
         if addr:
-            self._addr = addr.upper()
+            coords = Decode(addr.upper())
 
         if matrix:
             if all(isinstance(i, int) for i in matrix) and len(matrix) == 2:
-                self._addr = Encode(matrix)
+                coords = (matrix, )
 
             if all(isinstance(i, (list, tuple)) for i in matrix):
-                self._addr = Encode(*matrix)
+                coords = matrix
 
-        self._matrix = Decode(self._addr)
+        if not coords or len(coords) > 2 or any(len(c) != 2 for c in coords):
+            raise XlError('No valid add-ref or matrix assigned.')
 
-        if not all((self._addr, self._matrix, self._matrix[0])):
+        (row, column), (last_row, last_column) = coords[0], coords[-1]
+        return Address.Of(row or 0, column or 0, last_row or 0, last_column or 0)
+
+    @classmethod
+    @lru_cache(maxsize=__interned_size__)
+    def Of(cls, row: int, column: int, last_row: int, last_column: int):
+        """
+        Get the interned Address of coordinates, 0 for omitted row or column
+        :return: Address instance
+        """
+        if not any((row, column)):
             raise XlError('No valid add-ref or matrix assigned.')
 
+        addr = object.__new__(cls)
+        setter = super(Address, addr).__setattr__
+        setter('_row', row)
+        setter('_column', column)
+        setter('_last_row', last_row)
+        setter('_last_column', last_column)
+        setter('_hash', hash((row, column, last_row, last_column)))
+        return addr
+
+    def __setattr__(self, key, value):
+        raise XlError('Address is immutable.')
+
+    def __delattr__(self, item):
+        raise XlError('Address is immutable.')
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        if not isinstance(other, Address):
+            return NotImplemented
+
+        return self._hash == other._hash and self.Coordinates == other.Coordinates
+
+    def __reduce__(self):
+        return Address.Of, self.Coordinates
+
+    def __repr__(self):
+        return "Address('{0}')".format(self.Address)
+
+    __str__ = __repr__
+
     @property
     def Row(self):
-        return self._matrix[0][0] or 1
+        return self._row or 1
 
     @property
     def Column(self):
-        return self._matrix[0][1] or 1
+        return self._column or 1
 
     @property
     def RowCount(self):
-        if len(self._matrix) == 1:
-            return 1
-
-        return (self._matrix[1][0] or 1048576) - self.Row + 1
+        return (self._last_row or __sheet_rows__) - self.Row + 1
 
     @property
     def ColumnCount(self):
-        if len(self._matrix) == 1:
-            return 1
+        return (self._last_column or __sheet_columns__) - self.Column + 1
 
-        return (self._matrix[1][1] or 16384) - self.Column + 1
+    @property
+    def Coordinates(self) -> tuple:
+        """
+        Coordinates of both endpoints, 0 for omitted row or column
+        :return: (row, column, last row, last column)
+        """
+        return self._row, self._column, self._last_row, self._last_column
 
     @property
     def Matrix(self):
-        return self._matrix
+        first = (self._row or None, self._column or None)
+        last = (self._last_row or None, self._last_column or None)
+
+        if self.IsCell:
+            return first,
+
+        return first, last
 
     @property
     def Address(self):
-        return self._addr
+        return Encode(*self.Matrix)
+
+    @property
+    def Absolute(self):
+        """
+        Address in absolute reference style, as com object gives, e.g. '$A$1:$B$2', '$A:$B' or '$1:$2'. As Excel
+        does, cells across all columns are given as whole rows, otherwise those down all rows as whole columns
+        """
+        if self.Column == 1 and self.ColumnCount == __sheet_columns__:
+            return '${0}:${1}'.format(self.Row, self.Row + self.RowCount - 1)
+
+        if self.Row == 1 and self.RowCount == __sheet_rows__:
+            return '${0}:${1}'.format(Int2Letter26(self.Column), Int2Letter26(self.Column + self.ColumnCount - 1))
+
+        return ':'.join(('$' + Int2Letter26(c) if c else '') + ('$' + str(r) if r else '') for r, c in self.Matrix)
+
+    @property
+    def IsCell(self):
+        return self._row and self._column and self._row == self._last_row and self._column == self._last_column
 
     @property
     def IsRow(self):
-        return not self._matrix[0][1] or (self._matrix[1] and not self._matrix[1][1])
+        return not self._column or not self._last_column
 
     @property
     def IsColumn(self):
-        return not self._matrix[0][0] or (self._matrix[1] and not self._matrix[1][0])
+        return not self._row or not self._last_row
 
     def Resize(self, rows: tuple = (), columns: tuple = ()):
-        matrix = self.Matrix
+        """
+        Get the Address with rows and/or columns of endpoints changed, Address itself keeps unchanged
+        :param rows: (first row, last row)
+        :param columns: (first column, last column)
+        :return: Address instance
+        """
+        row, column, last_row, last_column = self.Coordinates
 
-        coords = [[matrix[0][0], matrix[0][1]], [matrix[1][0], matrix[1][1]]]
         if rows:
-            coords[0][0] = rows[0]
-            coords[1][0] = rows[1]
+            row, last_row = rows[0] or 0, rows[1] or 0
 
         if columns:
-            coords[0][1] = columns[0]
-            coords[1][1] = columns[1]
+            column, last_column = columns[0] or 0, columns[1] or 0
 
-        self._addr = Encode(*coords)
-        self._matrix = Decode(self._addr)
+        return Address.Of(row, column, last_row, last_column)
 
     def IndexOf(self, coord: tuple, abs: bool = False) -> int:
         if len(coord) == 2 and all(isinstance(c, int) for c in coord):
@@ -99,29 +198,94 @@ class Address(object):
 
 
 def Encode(*coords):
-    if any(len(coord) != 2 for coord in coords):
-        raise XlError('Must offer both row and column index for coordinates.')
-
-    address = ''
     for coord in coords:
-        if address:
-            address += ':'
+        if len(coord) != 2:
+            raise XlError('Must offer both row and column index for coordinates.')
 
-        if coord[1]:
-            address += Int2Letter26(coord[1])
+    if len(coords) == 1:
+        return _Unit(*coords[0])
 
-        if coord[0]:
-            address += str(coord[0])
+    return ':'.join([_Unit(*coord) for coord in coords])
 
-    return address
 
+def EncodeMany(rows, columns) -> list:
+    """
+    Encode coordinates of cells to A1 addresses in batch
+    :param rows: row indices, in sequence, array.array or numpy integer array
+    :param columns: column indices, in same length with rows
+    :return: list of addresses, e.g. ['A1', 'B2']
+    """
+    rows, columns = _Ints(rows), _Ints(columns)
+
+    if len(rows) != len(columns):
+        raise XlError('Rows and columns must be in same length.')
+
+    if not rows:
+        return []
+
+    if min(rows) < 1 or min(columns) < 1 or max(columns) >= len(__columns__):
+        raise XlError('Coordinate out of worksheet range.')
+
+    return list(map(add, map(__columns__.__getitem__, columns), map(str, rows)))
+
+
+def DecodeMany(addresses) -> (array, array):
+    """
+    Decode A1 addresses of single cells to coordinates in batch. All addresses are split by one pass of regular
+    expression over the joined text, rather than parsing address one by one.
+    :param addresses: sequence of addresses, e.g. ('A1', '$B$2')
+    :return: rows and columns, in 2 int arrays
+    """
+    if isinstance(addresses, str):
+        raise XlError('Use sequence of addresses, rather than str.')
+
+    if not addresses:
+        return array('i'), array('i')
+
+    units = __cells__.split('\n'.join(addresses).upper().replace('$', ''))
+    letters, digits = units[0:-1:2], units[1::2]
+
+    if len(digits) != len(addresses) or units[-1] or not ''.join(letters).isalpha():
+        raise XlError('Only addresses of single cells could be decoded.')
+
+    try:
+        rows, columns = array('i', map(int, digits)), array('i', map(__letters__.__getitem__, letters))
+    except KeyError as e:
+        raise XlError('Column {0} out of worksheet range.'.format(e))
+
+    if min(rows) < 1:
+        raise XlError('Coordinate in address matrix could not be lower than 1.')
+
+    return rows, columns
 
+
+def _Ints(values) -> list:
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+
+    return list(values)
+
+
+def _Unit(row: int, column: int) -> str:
+    if column:
+        if 0 < column < len(__columns__):
+            column = __columns__[column]
+        else:
+            column = Int2Letter26(column)
+    else:
+        column = ''
+
+    return column + str(row) if row else column
+
+
+@lru_cache(maxsize=__cache_size__)
 def Decode(address: str) -> (tuple, tuple):
     return tuple(Parse(unit) for unit in address.split(':'))
 
 
+@lru_cache(maxsize=__cache_size__)
 def Parse(addr: str) -> tuple:
-    units = re.findall(r'\d+|[A-Z]+', addr.upper())
+    units = __units__.findall(addr.upper())
 
     if len(units) > 2:
         raise XlError()
@@ -141,6 +305,9 @@ def Int2Letter26(n: int) -> str:
     if n < 1:
         raise XlError('Coordinate in address matrix could not be lower than 1.')
 
+    if n < len(__columns__):
+        return __columns__[n]
+
     address = ''
     while n > 0:
         n -= 1
@@ -151,15 +318,38 @@ def Int2Letter26(n: int) -> str:
 
 
 def Letter2Int26(s: str) -> int:
+    s = s.upper()
+    if s in __letters__:
+        return __letters__[s]
+
     i = 0
-    for c in s.upper():
+    for c in s:
         i = i * 26 + __dc__[c]
 
     return i
 
 
+def _Columns(count: int) -> tuple:
+    """
+    Build the column letters of the first <count> columns, in bijective base-26 order: A..Z, AA..ZZ, AAA..
+    :param count: number of columns to build
+    :return: tuple of letters, indexed by column number, item 0 is a blank placeholder
+    """
+    columns = ['']
+    width = 1
+    while len(columns) <= count:
+        columns.extend(''.join(p) for p in product(__chars__, repeat=width))
+        width += 1
+
+    return tuple(columns[:count + 1])
+
+
 __digits__ = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26)
 __chars__ = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q',
             'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z')
 
 __dc__ = dict(zip(__chars__, __digits__))
+
+# Lookup tables covering every column of a worksheet(A..XFD), in both directions
+__columns__ = _Columns(__sheet_columns__)
+__letters__ = dict((c, i) for i, c in enumerate(__columns__) if c)
@@ -0,0 +1,52 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+class Calculation:
+    xlCalculationAutomatic = -4105  # from enum XlCalculation
+    xlCalculationManual = -4135  # from enum XlCalculation
+    xlCalculationSemiautomatic = 2  # from enum XlCalculation
+
+
+class Direction:
+    xlDown = -4121  # from enum XlDirection
+    xlToLeft = -4159  # from enum XlDirection
+    xlToRight = -4161  # from enum XlDirection
+    xlUp = -4162  # from enum XlDirection
+
+
+class FindLookIn:
+    xlFormulas = -4123  # from enum XlFindLookIn
+    xlValues = -4163  # from enum XlFindLookIn
+
+
+class LookAt:
+    xlPart = 2  # from enum XlLookAt
+    xlWhole = 1  # from enum XlLookAt
+
+
+class SearchOrder:
+    xlByColumns = 2  # from enum XlSearchOrder
+    xlByRows = 1  # from enum XlSearchOrder
+
+
+class SearchDirection:
+    xlNext = 1  # from enum XlSearchDirection
+    xlPrevious = 2  # from enum XlSearchDirection
+
+
+class CVError:
+    xlErrBlocked = 2047  # from enum XlCVError
+    xlErrCalc = 2050  # from enum XlCVError
+    xlErrConnect = 2046  # from enum XlCVError
+    xlErrDiv0 = 2007  # from enum XlCVError
+    xlErrField = 2049  # from enum XlCVError
+    xlErrGettingData = 2043  # from enum XlCVError
+    xlErrNA = 2042  # from enum XlCVError
+    xlErrName = 2029  # from enum XlCVError
+    xlErrNull = 2000  # from enum XlCVError
+    xlErrNum = 2036  # from enum XlCVError
+    xlErrRef = 2023  # from enum XlCVError
+    xlErrSpill = 2045  # from enum XlCVError
+    xlErrUnknown = 2048  # from enum XlCVError
+    xlErrValue = 2015  # from enum XlCVError
@@ -0,0 +1,684 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import sys
+
+from os import path
+from time import sleep
+
+from . import constants
+from .address import Address
+from .constants import Calculation
+from .constants import CVError
+from .constants import Direction
+from .interior import ColorIndex
+from .xlerror import XlError
+
+
+class Dispatch(object):
+    """
+    Base of emulated com objects. Every access on a public member counts as a cross-process call: it is counted by
+    Application and delayed by the latency of Application. Members starting with '_' are local to the emulator, and
+    so are the members listed in __local__. Access made by the emulator itself, from a method of an emulated
+    object, is a part of the call being emulated and is not counted.
+    """
+    __local__ = frozenset()
+
+    # Modules where emulated objects are defined, see _Internal
+    __modules__ = set()
+
+    # Object closed in Excel, e.g. Workbook and its Worksheets, as com object disconnected
+    _gone = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Dispatch.__modules__.add(cls.__module__)
+
+    def __getattribute__(self, name):
+        if name[0] != '_' and name not in type(self).__local__ and not _Internal(sys._getframe(1)):
+            object.__getattribute__(self, '_application')._Tick()
+            if object.__getattribute__(self, '_gone'):
+                raise XlError('Object {0} is closed.'.format(type(self).__name__))
+
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name[0] != '_' and not _Internal(sys._getframe(1)):
+            self._application._Tick()
+
+        object.__setattr__(self, name, value)
+
+
+class Application(Dispatch):
+    """
+    Emulation of Excel Application, in memory. It covers the part of Excel object model used by xloa and applets,
+    so that they could be run and measured without Excel:
+        app = App(impl=Application(latency=0.0002))
+    :param latency: seconds spent on each call, to emulate the cost of cross-process calls
+    :param refresh: seconds spent after each write, to emulate recalculation, repainting and event handlers that
+        Excel runs unless they are turned off by Calculation, ScreenUpdating and EnableEvents
+    """
+    __local__ = frozenset(('Calls', 'Latency', 'Refreshes', 'Register', 'Runs'))
+
+    def __init__(self, latency: float = 0.0, refresh: float = 0.0):
+        self._application = self
+        object.__setattr__(self, 'Latency', latency)
+        object.__setattr__(self, 'Calls', 0)
+        object.__setattr__(self, 'Refreshes', 0)
+        object.__setattr__(self, 'Runs', list())
+
+        self._macros = dict()
+        self._books = Workbooks(self)
+        self._visible = False
+        self._refresh = refresh
+        self._screen_updating = True
+        self._calculation = Calculation.xlCalculationAutomatic
+        self._enable_events = True
+        self._display_status_bar = True
+
+    def _Tick(self):
+        object.__setattr__(self, 'Calls', self.Calls + 1)
+        if self.Latency:
+            sleep(self.Latency)
+
+    def _Refresh(self):
+        # Each of recalculation, repainting and events costs the same, when it is not turned off
+        times = sum((self._calculation == Calculation.xlCalculationAutomatic, self._screen_updating,
+                     self._enable_events))
+        if times:
+            object.__setattr__(self, 'Refreshes', self.Refreshes + times)
+            if self._refresh:
+                sleep(self._refresh * times)
+
+    def Register(self, name: str, macro):
+        """
+        Register python callable as macro for Run
+        :param name: macro name, e.g. 'Migration.OnResultCallBack'
+        :param macro: callable
+        :return: None
+        """
+        self._macros[name] = macro
+
+    @property
+    def Application(self):
+        return self
+
+    @property
+    def Name(self):
+        return 'Microsoft Excel'
+
+    @property
+    def Workbooks(self):
+        return self._books
+
+    @property
+    def ActiveWorkbook(self):
+        return self._books._Active()
+
+    @property
+    def Worksheets(self):
+        return self._books._Active().Worksheets
+
+    @property
+    def ActiveSheet(self):
+        return self._books._Active().ActiveSheet
+
+    @property
+    def ActiveCell(self):
+        return self._books._Active().ActiveSheet.Range('A1')
+
+    @property
+    def Visible(self):
+        return self._visible
+
+    @Visible.setter
+    def Visible(self, visibility: bool):
+        self._visible = visibility
+
+    @property
+    def ScreenUpdating(self):
+        return self._screen_updating
+
+    @ScreenUpdating.setter
+    def ScreenUpdating(self, updating: bool):
+        self._screen_updating = bool(updating)
+
+    @property
+    def Calculation(self):
+        return self._calculation
+
+    @Calculation.setter
+    def Calculation(self, calculation: int):
+        if calculation not in vars(Calculation).values():
+            raise XlError('Unknown calculation mode: {0}'.format(calculation))
+
+        self._calculation = calculation
+
+    @property
+    def EnableEvents(self):
+        return self._enable_events
+
+    @EnableEvents.setter
+    def EnableEvents(self, enabled: bool):
+        self._enable_events = bool(enabled)
+
+    @property
+    def DisplayStatusBar(self):
+        return self._display_status_bar
+
+    @DisplayStatusBar.setter
+    def DisplayStatusBar(self, display: bool):
+        self._display_status_bar = bool(display)
+
+    def Run(self, macro: str, *args):
+        self.Runs.append((macro, args))
+        if macro in self._macros:
+            return self._macros[macro](*args)
+
+
+class Workbooks(Dispatch):
+    def __init__(self, application: Application):
+        self._application = application
+        self._books = list()
+
+    def _Active(self):
+        if not self._books:
+            raise XlError('No workbook is opened.')
+
+        return self._books[-1]
+
+    def __call__(self, item):
+        # Call of default member, Item is a part of it
+        self._application._Tick()
+        return self.Item(item)
+
+    def __getitem__(self, item):
+        self._application._Tick()
+        return self.Item(item)
+
+    @property
+    def Application(self):
+        return self._application
+
+    @property
+    def Count(self):
+        return len(self._books)
+
+    def Item(self, item):
+        return _Item(self._books, item, 'Workbook')
+
+    def Add(self, name: str = None):
+        book = Workbook(self._application, name or 'Book{0}'.format(len(self._books) + 1))
+        self._books.append(book)
+        return book
+
+    def Open(self, file_name: str):
+        book = Workbook(self._application, path.basename(file_name), file_name)
+        self._books.append(book)
+        return book
+
+    def Close(self):
+        for book in list(self._books):
+            book.Close()
+
+
+class Workbook(Dispatch):
+    def __init__(self, application: Application, name: str, full_name: str = None):
+        self._application = application
+        self._name = name
+        self._full_name = full_name or name
+        self._sheets = Worksheets(application, self)
+        self._sheets.Add('Sheet1')
+
+    @property
+    def Application(self):
+        return self._application
+
+    @property
+    def Name(self):
+        return self._name
+
+    @property
+    def FullName(self):
+        return self._full_name
+
+    @property
+    def Worksheets(self):
+        return self._sheets
+
+    @property
+    def ActiveSheet(self):
+        return self._sheets._sheets[0]
+
+    @property
+    def Saved(self):
+        return True
+
+    def Close(self, *args):
+        self._application._books._books.remove(self)
+        self._gone = True
+        for sheet in self._sheets._sheets:
+            sheet._gone = True
+
+
+class Worksheets(Dispatch):
+    def __init__(self, application: Application, book: Workbook):
+        self._application = application
+        self._book = book
+        self._sheets = list()
+
+    def __call__(self, item):
+        self._application._Tick()
+        return self.Item(item)
+
+    def __getitem__(self, item):
+        self._application._Tick()
+        return self.Item(item)
+
+    @property
+    def Application(self):
+        return self._application
+
+    @property
+    def Count(self):
+        return len(self._sheets)
+
+    def Item(self, item):
+        return _Item(self._sheets, item, 'Worksheet')
+
+    def Add(self, name: str = None):
+        sheet = Worksheet(self._application, self._book, name or 'Sheet{0}'.format(len(self._sheets) + 1))
+        self._sheets.append(sheet)
+        return sheet
+
+
+class Worksheet(Dispatch):
+    """
+    Emulated Worksheet, values and colors are kept in dict by (row, column). Storage is accessed only through the
+    methods starting with '_', so that another storage could be plugged in by overriding them.
+    """
+    __rows__ = 1048576
+    __columns__ = 16384
+
+    # Rows or columns read by one _Block when cells are scanned
+    __chunk__ = 1024
+
+    def __init__(self, application: Application, book: Workbook, name: str):
+        self._application = application
+        self._book = book
+        self._name = name
+        self._cells = dict()
+        self._colors = dict()
+        self._extent = None
+
+    def _Get(self, row: int, column: int):
+        return self._cells.get((row, column))
+
+    def _Set(self, row: int, column: int, value):
+        if value is None or value == '':
+            self._cells.pop((row, column), None)
+        else:
+            self._cells[(row, column)] = value
+            self._Extend(row, column)
+
+    def _Block(self, row: int, column: int, last_row: int, last_column: int) -> tuple:
+        get = self._cells.get
+        return tuple(tuple(get((r, c)) for c in range(column, last_column + 1)) for r in range(row, last_row + 1))
+
+    def _GetColor(self, row: int, column: int):
+        return self._colors.get((row, column))
+
+    def _SetColor(self, row: int, column: int, color: int or None):
+        if color is None:
+            self._colors.pop((row, column), None)
+        else:
+            self._colors[(row, column)] = color
+            self._Extend(row, column)
+
+    def _Extend(self, row: int, column: int):
+        # As Excel does, used range grows on writing, but does not shrink on clearing
+        if self._extent is None:
+            self._extent = (row, column, row, column)
+        else:
+            r, c, lr, lc = self._extent
+            self._extent = (min(r, row), min(c, column), max(lr, row), max(lc, column))
+
+    def _Used(self) -> tuple:
+        return self._extent or (1, 1, 1, 1)
+
+    def _Scan(self, row: int, column: int, last_row: int, last_column: int) -> list:
+        # (row, column) of cells that have value in area, in no order
+        return [(r, c) for r, c in self._cells if row <= r <= last_row and column <= c <= last_column]
+
+    def _ScanBlocks(self, row: int, column: int, last_row: int, last_column: int) -> list:
+        # _Scan through _Block, for storage that has no index of cells. Cells out of used range are blank, so only
+        # the part of area in used range is read, in blocks of __chunk__ rows from top down
+        top, left, bottom, right = self._Used()
+        row, column = max(row, top), max(column, left)
+        last_row, last_column = min(last_row, bottom), min(last_column, right)
+
+        cells = list()
+        for start in range(row, last_row + 1, self.__chunk__):
+            block = self._Block(start, column, min(start + self.__chunk__ - 1, last_row), last_column)
+            for r, values in enumerate(block, start):
+                cells.extend((r, c) for c, v in enumerate(values, column) if not _Blank(v))
+
+        return cells
+
+    def _Range(self, *areas) -> 'Range':
+        return Range(self._application, self, list(areas))
+
+    @property
+    def Application(self):
+        return self._application
+
+    @property
+    def Parent(self):
+        return self._book
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name: str):
+        self._name = name
+
+    @property
+    def Cells(self):
+        return self._Range((1, 1, self.__rows__, self.__columns__))
+
+    @property
+    def Rows(self):
+        return Range(self._application, self, [(1, 1, self.__rows__, self.__columns__)], 'rows')
+
+    @property
+    def Columns(self):
+        return Range(self._application, self, [(1, 1, self.__rows__, self.__columns__)], 'columns')
+
+    @property
+    def UsedRange(self):
+        return self._Range(self._Used())
+
+    def Range(self, cell1, cell2=None):
+        return self._Range((1, 1, self.__rows__, self.__columns__)).Range(cell1, cell2)
+
+
+class Range(Dispatch):
+    """
+    Emulated Range, made of areas in (row, column, last row, last column). The mode tells what Item and Count work
+    on: 'cells', 'rows' or 'columns', as Range, Range.Rows and Range.Columns do in Excel.
+    """
+    def __init__(self, application: Application, sheet: Worksheet, areas: list, mode: str = 'cells'):
+        self._application = application
+        self._sheet = sheet
+        self._areas = areas
+        self._mode = mode
+
+    def _Cells(self):
+        for row, column, last_row, last_column in self._areas:
+            for r in range(row, last_row + 1):
+                for c in range(column, last_column + 1):
+                    yield r, c
+
+    def _Relative(self, row: int, column: int, last_row: int, last_column: int) -> tuple:
+        top, left = self._areas[0][0] - 1, self._areas[0][1] - 1
+        return top + row, left + column, top + last_row, left + last_column
+
+    def _Shape(self) -> tuple:
+        row, column, last_row, last_column = self._areas[0]
+        return last_row - row + 1, last_column - column + 1
+
+    def __call__(self, *args):
+        self._application._Tick()
+        return self.Item(*args)
+
+    @property
+    def Application(self):
+        return self._application
+
+    @property
+    def Worksheet(self):
+        return self._sheet
+
+    @property
+    def Address(self):
+        # As Excel gives, e.g. '$C:$C' for a whole column, rather than '$C$1:$C$1048576'
+        return ','.join(Address.Of(*area).Absolute for area in self._areas)
+
+    @property
+    def Row(self):
+        return self._areas[0][0]
+
+    @property
+    def Column(self):
+        return self._areas[0][1]
+
+    @property
+    def Count(self):
+        rows, columns = self._Shape()
+        if self._mode == 'rows':
+            return rows
+
+        if self._mode == 'columns':
+            return columns
+
+        return sum((lr - r + 1) * (lc - c + 1) for r, c, lr, lc in self._areas)
+
+    @property
+    def Cells(self):
+        return Range(self._application, self._sheet, self._areas)
+
+    @property
+    def Rows(self):
+        return Range(self._application, self._sheet, self._areas, 'rows')
+
+    @property
+    def Columns(self):
+        return Range(self._application, self._sheet, self._areas, 'columns')
+
+    @property
+    def Interior(self):
+        return Interior(self._application, self)
+
+    @property
+    def Text(self):
+        value = self._sheet._Get(*self._areas[0][:2])
+        return '' if value is None else str(value)
+
+    @property
+    def Value(self):
+        block = self._sheet._Block(*self._areas[0])
+        if len(block) == 1 and len(block[0]) == 1:
+            return block[0][0]
+
+        return block
+
+    @Value.setter
+    def Value(self, value):
+        self._application._Refresh()
+        if not isinstance(value, (tuple, list)):
+            for r, c in self._Cells():
+                self._sheet._Set(r, c, value)
+            return
+
+        if value and not isinstance(value[0], (tuple, list)):
+            value = (value, )
+
+        row, column, last_row, last_column = self._areas[0]
+        for i, r in enumerate(range(row, last_row + 1)):
+            for j, c in enumerate(range(column, last_column + 1)):
+                if i < len(value) and j < len(value[i]):
+                    self._sheet._Set(r, c, value[i][j])
+                else:
+                    self._sheet._Set(r, c, ErrorValue(CVError.xlErrNA))
+
+    def Item(self, row, column: int = None):
+        rows, columns = self._Shape()
+
+        if isinstance(row, str):
+            addr = Address(addr=row)
+            if self._mode == 'rows':
+                area = (addr.Row, 1, addr.Row + addr.RowCount - 1, columns)
+            elif self._mode == 'columns':
+                area = (1, addr.Column, rows, addr.Column + addr.ColumnCount - 1)
+            else:
+                return self.Range(row)
+
+            return Range(self._application, self._sheet, [self._Relative(*area)], self._mode)
+
+        if column is None:
+            if self._mode == 'rows':
+                return Range(self._application, self._sheet, [self._Relative(row, 1, row, columns)], 'rows')
+
+            if self._mode == 'columns':
+                return Range(self._application, self._sheet, [self._Relative(1, row, rows, row)], 'columns')
+
+            row, column = (row - 1) // columns + 1, (row - 1) % columns + 1
+
+        return Range(self._application, self._sheet, [self._Relative(row, column, row, column)])
+
+    def Range(self, cell1, cell2=None):
+        if isinstance(cell1, Range):
+            cells = cell1._areas[0] + (cell2 or cell1)._areas[0]
+            rows, columns = cells[0::2], cells[1::2]
+            area = (min(rows), min(columns), max(rows), max(columns))
+            return Range(self._application, self._sheet, [area])
+
+        if cell2:
+            cell1 = '{0}:{1}'.format(cell1, cell2)
+
+        areas = list()
+        for expr in cell1.split(','):
+            addr = Address(addr=expr)
+            area = (addr.Row, addr.Column, addr.Row + addr.RowCount - 1, addr.Column + addr.ColumnCount - 1)
+            areas.append(self._Relative(*area))
+
+        return Range(self._application, self._sheet, areas)
+
+    def End(self, direction: int):
+        # As Ctrl + arrow key: from a cell with value, to the last cell of the run of cells with value; otherwise
+        # to the next cell with value, or to the edge of Worksheet when there is none
+        row, column = self._areas[0][:2]
+        rows, columns = self._sheet.__rows__, self._sheet.__columns__
+        if direction == Direction.xlUp:
+            step, area = (-1, 0), (1, column, row - 1, column)
+        elif direction == Direction.xlDown:
+            step, area = (1, 0), (row + 1, column, rows, column)
+        elif direction == Direction.xlToLeft:
+            step, area = (0, -1), (row, 1, row, column - 1)
+        elif direction == Direction.xlToRight:
+            step, area = (0, 1), (row, column + 1, row, columns)
+        else:
+            raise XlError('Unknown direction: {0}'.format(direction))
+
+        cells = set(self._sheet._Scan(*area))
+        end = row, column
+        forward = lambda cell: (cell[0] + step[0], cell[1] + step[1])
+        if not _Blank(self._sheet._Get(row, column)) and forward(end) in cells:
+            while forward(end) in cells:
+                end = forward(end)
+        elif cells:
+            # The nearest in direction
+            end = (max if sum(step) < 0 else min)(cells)
+        else:
+            # Edge of Worksheet
+            end = (area[0], area[1]) if sum(step) < 0 else (area[2], area[3])
+
+        return Range(self._application, self._sheet, [end + end])
+
+    def Find(self, What, After=None, LookIn=None, LookAt=None, SearchOrder=constants.SearchOrder.xlByRows,
+             SearchDirection=constants.SearchDirection.xlNext, *args):
+        # Only What='*', any cell with value, is emulated. Formulas are not emulated, so LookIn makes no
+        # difference. As Excel does, search starts after the first cell of Range, so it is the last cell searched;
+        # a Range of single cell searches the whole Worksheet
+        if What != '*':
+            raise XlError('Only \'*\' is emulated for What of Find.')
+        if After is not None:
+            raise XlError('After of Find is not emulated.')
+
+        area = self._areas[0]
+        if area[0] == area[2] and area[1] == area[3]:
+            area = (1, 1, self._sheet.__rows__, self._sheet.__columns__)
+
+        cells = self._sheet._Scan(*area)
+        if not cells:
+            return None
+
+        order = (lambda cell: cell) if SearchOrder != constants.SearchOrder.xlByColumns else \
+            (lambda cell: (cell[1], cell[0]))
+        if SearchDirection == constants.SearchDirection.xlPrevious:
+            found = max(cells, key=order)
+        else:
+            found = min((cell for cell in cells if cell != area[:2]), key=order, default=area[:2])
+
+        return Range(self._application, self._sheet, [found + found])
+
+
+class Interior(Dispatch):
+    def __init__(self, application: Application, rng: Range):
+        self._application = application
+        self._range = rng
+
+    @property
+    def Color(self):
+        color = self._range._sheet._GetColor(self._range._areas[0][0], self._range._areas[0][1])
+        return 16777215 if color is None else color
+
+    @Color.setter
+    def Color(self, color: int):
+        self._application._Refresh()
+        for r, c in self._range._Cells():
+            self._range._sheet._SetColor(r, c, int(color))
+
+    @property
+    def ColorIndex(self):
+        color = self._range._sheet._GetColor(self._range._areas[0][0], self._range._areas[0][1])
+        return ColorIndex.xlColorIndexNone if color is None else 1
+
+    @ColorIndex.setter
+    def ColorIndex(self, index: int):
+        if index != ColorIndex.xlColorIndexNone:
+            raise XlError('Only xlColorIndexNone is emulated for ColorIndex.')
+
+        for r, c in self._range._Cells():
+            self._range._sheet._SetColor(r, c, None)
+
+
+def ErrorValue(code: int) -> int:
+    """
+    Value of error cell as com object gives, e.g. -2146826281 for #DIV/0!
+    :param code: error code, see constants.CVError
+    :return: int
+    """
+    return __error_base__ + code
+
+
+def _Item(items: list, item, kind: str):
+    if isinstance(item, int):
+        if 1 <= item <= len(items):
+            return items[item - 1]
+    else:
+        for i in items:
+            if i._name.lower() == str(item).lower():
+                return i
+
+    raise XlError('{0} {1} does not exist.'.format(kind, item))
+
+
+def _Blank(value) -> bool:
+    return value is None or value == ''
+
+
+def _Internal(frame) -> bool:
+    # Whether the frame is a method of an emulated object, locals are looked into only for modules of them
+    code = frame.f_code
+    if not code.co_argcount or frame.f_globals.get('__name__') not in Dispatch.__modules__:
+        return False
+
+    return isinstance(frame.f_locals.get(code.co_varnames[0]), Dispatch)
+
+
+# Error value in com is HRESULT 0x800A0000 plus error code, read as signed int
+__error_base__ = -2146828288
@@ -0,0 +1,201 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import asyncio
+import queue
+import threading
+
+from concurrent.futures import Future
+
+from timber import timber
+
+from .xlneuro import App
+from .xlneuro import Range
+from .xlerror import XlError
+
+try:
+    import pythoncom
+except ImportError:
+    # No com on this platform, executor works with the backend given by connect, e.g. emulator.Application
+    pythoncom = None
+
+
+class ComExecutor(object):
+    """
+    A thread that owns the com connection, all com calls are made on it one by one in the order they are submitted.
+    Com objects live in the apartment of the thread that creates them, so App is created on the thread by connect,
+    and is never used by other threads; by default it has a dispatch of its own, not shared with other threads.
+    Calling thread is free to do its own work while com calls are going on,
+    coroutines let applets overlap reading next block with processing current one:
+        async def main(executor):
+            async for block in executor.read_blocks('data.xlsx', 'Sheet1', ('A1:D1000', 'A1001:D2000')):
+                process(block)
+
+        with ComExecutor() as executor:
+            asyncio.run(main(executor))
+    :param connect: callable that creates App on the thread, a new dispatch of Excel by default, e.g.
+        lambda: App(impl=emulator.Application())
+    :param name: name of the thread
+    """
+    def __init__(self, connect=None, name: str = 'xloa-com'):
+        self._queue = queue.Queue()
+        self._closed = False
+        # Closing and queueing are made one at a time, no call is queued after the thread is told to stop
+        self._lock = threading.Lock()
+
+        ready = Future()
+        connect = connect or _Connect
+        self._thread = threading.Thread(target=self._Run, args=(connect, ready), name=name, daemon=True)
+        self._thread.start()
+        self._app = ready.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.Close()
+
+    def _Run(self, connect, ready: Future):
+        initialized = False
+        try:
+            try:
+                if pythoncom:
+                    pythoncom.CoInitialize()
+                    initialized = True
+                app = connect()
+            except BaseException as e:
+                ready.set_exception(e)
+                return
+
+            ready.set_result(app)
+
+            while True:
+                task = self._queue.get()
+                if task is None:
+                    break
+
+                future, fn, args, kwargs = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            # Com objects of this thread, and shared dispatch made by connect on it, are released before the
+            # apartment is gone
+            app = args = self._app = None
+            App.Disconnect()
+            if initialized:
+                pythoncom.CoUninitialize()
+
+    @property
+    def App(self) -> App:
+        """
+        App of the thread, it must only be used in functions submitted to executor
+        """
+        return self._app
+
+    def Submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Queue a call to be made on the thread
+        :param fn: callable, its first argument is App of the thread
+        :return: concurrent.futures.Future of the result
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise XlError('Com executor is closed.')
+
+            self._queue.put((future, fn, (self._app, ) + args, kwargs))
+
+        return future
+
+    def Close(self, wait: bool = True):
+        """
+        Stop the thread after calls queued are done
+        :param wait: wait for the thread to stop
+        :return: None
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._queue.put(None)
+
+        if wait:
+            self._thread.join()
+
+    async def call(self, fn, *args, **kwargs):
+        """
+        Coroutine of a call made on the thread, see Submit
+        """
+        return await asyncio.wrap_future(self.Submit(fn, *args, **kwargs))
+
+    async def read_range(self, book: str, sheet: str, address: str) -> tuple:
+        """
+        Read values of Range
+        :param book: name of Workbook
+        :param sheet: name of Worksheet
+        :param address: address of Range
+        :return: tuple of row tuples, single cell is given in 2d as well
+        """
+        return await self.call(_Read, book, sheet, address)
+
+    async def write_range(self, book: str, sheet: str, address: str, values):
+        """
+        Write values into Range
+        :param book: name of Workbook
+        :param sheet: name of Worksheet
+        :param address: address of Range
+        :param values: scalar, or tuple of row tuples
+        :return: None
+        """
+        return await self.call(_Write, book, sheet, address, values)
+
+    async def run_macro(self, name: str, *args):
+        """
+        Run VBA macro
+        :param name: name of macro, e.g. 'Migration.OnResultCallBack'
+        :param args: arguments of macro
+        :return: result of macro
+        """
+        return await self.call(_Run, name, *args)
+
+    async def read_blocks(self, book: str, sheet: str, addresses):
+        """
+        Read Ranges one after another, the next Range is read while the current one is being processed by caller
+        :param book: name of Workbook
+        :param sheet: name of Worksheet
+        :param addresses: iterable of addresses
+        :return: async generator of values, in tuple of row tuples
+        """
+        pending = None
+        for address in addresses:
+            reading = asyncio.ensure_future(self.read_range(book, sheet, address))
+            if pending is not None:
+                yield await pending
+            pending = reading
+
+        if pending is not None:
+            yield await pending
+
+
+def _Connect() -> App:
+    return App(shared=False)
+
+
+def _Read(app: App, book: str, sheet: str, address: str) -> tuple:
+    return Range.Matrix(app.Workbooks[book].Worksheets[sheet].Range(address).Value)
+
+
+def _Write(app: App, book: str, sheet: str, address: str, values):
+    app.Workbooks[book].Worksheets[sheet].Range(address).Value = values
+
+
+def _Run(app: App, name: str, *args):
+    timber.debug('Run macro %s on com thread.', name)
+    return app.Macro(name)(*args)
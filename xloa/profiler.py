@@ -0,0 +1,242 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import atexit
+import json
+import os
+import sys
+
+from array import array
+from datetime import date
+from time import perf_counter
+from types import BuiltinMethodType
+from types import FunctionType
+from types import MethodType
+
+
+class Profiler(object):
+    """
+    Accounting of com calls. While a Profiler is active, com objects used by xloa are wrapped by Probe, then every
+    property get, property set and method call is counted by (xloa class, member name), with its latency and the
+    call site out of xloa that leads to it.
+        with Profiler() as profiler:
+            migrator()
+        profiler.Dump('profile.json')
+    Setting environment variable XLOA_PROFILE to a file path profiles the whole process, and the report is dumped
+    to that file at exit, so that a job could be profiled without touching its code.
+    """
+    __active__ = list()
+
+    def __init__(self, top: int = 20):
+        self._top = top
+        self._latency = dict()
+        self._sites = dict()
+
+    def __enter__(self):
+        Profiler.__active__.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        Profiler.__active__.remove(self)
+
+    @staticmethod
+    def Active():
+        """
+        The innermost active Profiler
+        :return: Profiler instance, or None when profiling is off
+        """
+        return Profiler.__active__[-1] if Profiler.__active__ else None
+
+    def Record(self, kind: str, member: str, elapsed: float):
+        """
+        Record a com call, xloa class that makes the call and call site are worked out from stack
+        :param kind: 'get', 'set' or 'call'
+        :param member: name of property or method
+        :param elapsed: latency in seconds
+        :return: None
+        """
+        owner, site = _Caller(sys._getframe(2))
+
+        key = (owner, member, kind)
+        if key not in self._latency:
+            self._latency[key] = array('d')
+        self._latency[key].append(elapsed)
+
+        count, total = self._sites.get(site, (0, 0.0))
+        self._sites[site] = (count + 1, total + elapsed)
+
+    def Report(self) -> dict:
+        """
+        Summary of com calls recorded, calls are sorted by total latency
+        :return: dict in form of:
+            {'count': ..., 'total': ..., 'calls': [{'owner', 'member', 'kind', 'count', 'total', 'mean', 'p50',
+            'p90', 'p99', 'max'}, ...], 'sites': [{'site', 'count', 'total'}, ...]}
+        """
+        calls = list()
+        for (owner, member, kind), latency in self._latency.items():
+            ordered = sorted(latency)
+            calls.append({
+                'owner': owner,
+                'member': member,
+                'kind': kind,
+                'count': len(ordered),
+                'total': sum(ordered),
+                'mean': sum(ordered) / len(ordered),
+                'p50': _Percentile(ordered, 50),
+                'p90': _Percentile(ordered, 90),
+                'p99': _Percentile(ordered, 99),
+                'max': ordered[-1],
+            })
+        calls.sort(key=lambda c: c['total'], reverse=True)
+
+        sites = sorted(self._sites.items(), key=lambda s: s[1][1], reverse=True)[:self._top]
+
+        return {
+            'count': sum(c['count'] for c in calls),
+            'total': sum(c['total'] for c in calls),
+            'calls': calls,
+            'sites': [{'site': site, 'count': count, 'total': total} for site, (count, total) in sites],
+        }
+
+    def Dump(self, file):
+        """
+        Dump report in json
+        :param file: path or file object
+        :return: None
+        """
+        if isinstance(file, str):
+            with open(file, 'w', encoding='utf-8') as fp:
+                json.dump(self.Report(), fp, ensure_ascii=False, indent=2)
+        else:
+            json.dump(self.Report(), file, ensure_ascii=False, indent=2)
+
+
+class Probe(object):
+    """
+    Proxy of com object that reports every access on it to Profiler. Com objects returned from it are wrapped by
+    Probe as well, so all com objects reached from a probed Application are probed.
+    """
+    __slots__ = ('_impl', '_member', '_profiler')
+
+    def __init__(self, impl, member: str, profiler: Profiler):
+        object.__setattr__(self, '_impl', impl)
+        object.__setattr__(self, '_member', member)
+        object.__setattr__(self, '_profiler', profiler)
+
+    def __getattr__(self, name):
+        start = perf_counter()
+        value = getattr(self._impl, name)
+        elapsed = perf_counter() - start
+
+        # A bound method is looked up locally, the round trip happens when it is called
+        if isinstance(value, (MethodType, FunctionType, BuiltinMethodType)) and not hasattr(value, '_oleobj_'):
+            return Probe(value, name, self._profiler)
+
+        self._profiler.Record('get', name, elapsed)
+        return _Wrap(value, name, self._profiler)
+
+    def __setattr__(self, name, value):
+        start = perf_counter()
+        setattr(self._impl, name, Unwrap(value))
+        self._profiler.Record('set', name, perf_counter() - start)
+
+    def __call__(self, *args, **kwargs):
+        start = perf_counter()
+        value = self._impl(*(Unwrap(a) for a in args), **dict((k, Unwrap(v)) for k, v in kwargs.items()))
+        self._profiler.Record('call', self._member, perf_counter() - start)
+        return _Wrap(value, self._member, self._profiler)
+
+    def __getitem__(self, item):
+        start = perf_counter()
+        value = self._impl[Unwrap(item)]
+        self._profiler.Record('call', '__getitem__', perf_counter() - start)
+        return _Wrap(value, self._member, self._profiler)
+
+    def __len__(self):
+        start = perf_counter()
+        value = len(self._impl)
+        self._profiler.Record('call', '__len__', perf_counter() - start)
+        return value
+
+    def __bool__(self):
+        # Truth of com object is what it gives, e.g. by Count of a collection, not that of a proxy
+        start = perf_counter()
+        value = bool(self._impl)
+        self._profiler.Record('call', '__bool__', perf_counter() - start)
+        return value
+
+    def __iter__(self):
+        start = perf_counter()
+        items = iter(self._impl)
+        self._profiler.Record('call', '__iter__', perf_counter() - start)
+        for item in items:
+            yield _Wrap(item, self._member, self._profiler)
+
+    def __eq__(self, other):
+        return self._impl == Unwrap(other)
+
+    def __hash__(self):
+        return hash(self._impl)
+
+    def __repr__(self):
+        return 'Probe({0!r})'.format(self._impl)
+
+
+def Instrument(impl):
+    """
+    Wrap com object by Probe when there is an active Profiler
+    :param impl: com object
+    :return: Probe or com object itself
+    """
+    profiler = Profiler.Active()
+    if profiler is None or impl is None or isinstance(impl, Probe):
+        return impl
+
+    return Probe(impl, type(impl).__name__, profiler)
+
+
+def Unwrap(value):
+    """
+    Get com object out of Probe, com objects passed back to com calls must be the original ones
+    """
+    return value._impl if isinstance(value, Probe) else value
+
+
+def _Wrap(value, member: str, profiler: Profiler):
+    if isinstance(value, __scalars__):
+        return value
+
+    return Probe(value, member, profiler)
+
+
+def _Caller(frame) -> (str, str):
+    """
+    Find the xloa class that makes the call, and the first call site out of xloa
+    """
+    owner = None
+    while frame and frame.f_code.co_filename.startswith(__package_dir__):
+        if owner is None and frame.f_code.co_argcount and frame.f_code.co_varnames[0] == 'self':
+            owner = type(frame.f_locals['self']).__name__
+        frame = frame.f_back
+
+    if frame is None:
+        return owner or '', ''
+
+    return owner or '', '{0}:{1}({2})'.format(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+
+
+def _Percentile(ordered, percent: int) -> float:
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+def _Start(path: str):
+    profiler = Profiler().__enter__()
+    atexit.register(profiler.Dump, path)
+
+
+__scalars__ = (type(None), bool, int, float, str, bytes, tuple, list, dict, date)
+__package_dir__ = os.path.dirname(os.path.abspath(__file__))
+
+if os.environ.get('XLOA_PROFILE'):
+    _Start(os.environ['XLOA_PROFILE'])
@@ -0,0 +1,313 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+from .address import Address
+from .address import Encode
+from .xlerror import XlError
+
+
+class Region(object):
+    """
+    A set of cells in worksheet, which is stored as horizontal bands rather than cells. Each band covers a run of
+    rows that share the same column spans:
+        ((top row, bottom row, ((first column, last column), ...)), ...)
+    Bands are sorted and never overlap, and 2 adjacent bands never share same spans, so that the same cells are
+    always stored in the same way. Rectangles are given in (row, column, last row, last column) as
+    Address.Coordinates does.
+    """
+    __slots__ = ('_bands', )
+
+    def __init__(self, bands: tuple = ()):
+        self._bands = tuple(bands)
+
+    @staticmethod
+    def FromCells(cells) -> 'Region':
+        """
+        Coalesce cells into region
+        :param cells: iterable of (row, column)
+        :return: Region instance
+        """
+        rows = dict()
+        for row, column in cells:
+            if row in rows:
+                rows[row].append(column)
+            else:
+                rows[row] = [column]
+
+        bands = list()
+        for row in sorted(rows):
+            _Append(bands, row, row, _Runs(sorted(set(rows[row]))))
+
+        return Region(bands)
+
+    @staticmethod
+    def FromRectangles(rectangles) -> 'Region':
+        """
+        Union of rectangles
+        :param rectangles: iterable of (row, column, last row, last column)
+        :return: Region instance
+        """
+        rects = sorted(Region.Rectangle(*rect).Bounds for rect in rectangles)
+        edges = sorted({r[0] for r in rects} | {r[2] + 1 for r in rects})
+
+        bands = list()
+        active = list()
+        k = 0
+        for top, stop in zip(edges, edges[1:]):
+            while k < len(rects) and rects[k][0] == top:
+                active.append(rects[k])
+                k += 1
+
+            active = [r for r in active if r[2] >= top]
+            _Append(bands, top, stop - 1, _Merge(sorted((r[1], r[3]) for r in active)))
+
+        return Region(bands)
+
+    @staticmethod
+    def FromAddress(address: str or Address) -> 'Region':
+        """
+        Region of address expression, multiple areas could be given in comma separated, e.g. 'A1:A400,C7:D90'
+        :param address: str or Address instance
+        :return: Region instance
+        """
+        if isinstance(address, Address):
+            return Region.Rectangle(*_Bounds(address))
+
+        return Region.FromRectangles(_Bounds(Address(addr=a)) for a in address.split(','))
+
+    @staticmethod
+    def Rectangle(row: int, column: int, last_row: int, last_column: int) -> 'Region':
+        if row < 1 or column < 1:
+            raise XlError('Coordinate in address matrix could not be lower than 1.')
+
+        row, last_row = min(row, last_row), max(row, last_row)
+        column, last_column = min(column, last_column), max(column, last_column)
+
+        return Region(((row, last_row, ((column, last_column), )), ))
+
+    @property
+    def Bands(self) -> tuple:
+        return self._bands
+
+    @property
+    def Count(self) -> int:
+        """
+        Number of cells in region
+        """
+        return sum((b - t + 1) * sum(r - l + 1 for l, r in spans) for t, b, spans in self._bands)
+
+    @property
+    def Bounds(self) -> tuple or None:
+        """
+        The bounding rectangle of region
+        :return: (row, column, last row, last column), or None for empty region
+        """
+        if not self._bands:
+            return None
+
+        column = min(spans[0][0] for _, _, spans in self._bands)
+        last_column = max(spans[-1][1] for _, _, spans in self._bands)
+        return self._bands[0][0], column, self._bands[-1][1], last_column
+
+    def Rectangles(self) -> list:
+        """
+        Split region into rectangles. A column span is extended downwards as long as the following bands contain the
+        same span, so a column that is broken into several bands by its neighbours still comes out as one rectangle.
+        :return: list of (row, column, last row, last column), in order of top-left corner
+        """
+        rectangles = list()
+        opened = dict()
+        last = None
+
+        for top, bottom, spans in self._bands:
+            if last is not None and top != last + 1:
+                rectangles.extend(opened.values())
+                opened = dict()
+
+            current = dict()
+            for span in spans:
+                if span in opened:
+                    row = opened.pop(span)[0]
+                else:
+                    row = top
+                current[span] = (row, span[0], bottom, span[1])
+
+            rectangles.extend(opened.values())
+            opened = current
+            last = bottom
+
+        rectangles.extend(opened.values())
+        rectangles.sort()
+        return rectangles
+
+    def Addresses(self, limit: int or None = 255) -> list:
+        """
+        Address expressions of region, areas are joined by comma. Excel refuses address longer than 255 characters,
+        so areas are split into several expressions by the limit.
+        :param limit: max length of each expression, None for no limit
+        :return: list of str
+        """
+        expressions = list()
+        areas = list()
+        length = -1
+
+        for row, column, last_row, last_column in self.Rectangles():
+            if (row, column) == (last_row, last_column):
+                area = Encode((row, column))
+            else:
+                area = Encode((row, column), (last_row, last_column))
+
+            if areas and limit and length + len(area) + 1 > limit:
+                expressions.append(','.join(areas))
+                areas = list()
+                length = -1
+
+            areas.append(area)
+            length += len(area) + 1
+
+        if areas:
+            expressions.append(','.join(areas))
+
+        return expressions
+
+    def Union(self, other: 'Region') -> 'Region':
+        return _Combine(self, other, lambda a, b: a or b)
+
+    def Intersection(self, other: 'Region') -> 'Region':
+        return _Combine(self, other, lambda a, b: a and b)
+
+    def Difference(self, other: 'Region') -> 'Region':
+        return _Combine(self, other, lambda a, b: a and not b)
+
+    __or__ = Union
+    __and__ = Intersection
+    __sub__ = Difference
+
+    def __contains__(self, cell: tuple) -> bool:
+        row, column = cell
+        for top, bottom, spans in self._bands:
+            if top <= row <= bottom:
+                return any(l <= column <= r for l, r in spans)
+
+        return False
+
+    def __iter__(self):
+        """
+        Iterate through cells in region, from left to right and then next row
+        :return: Generator of (row, column)
+        """
+        for top, bottom, spans in self._bands:
+            for row in range(top, bottom + 1):
+                for l, r in spans:
+                    for column in range(l, r + 1):
+                        yield row, column
+
+    def __len__(self):
+        return self.Count
+
+    def __bool__(self):
+        return bool(self._bands)
+
+    def __eq__(self, other):
+        if not isinstance(other, Region):
+            return NotImplemented
+
+        return self._bands == other._bands
+
+    def __hash__(self):
+        return hash(self._bands)
+
+    def __repr__(self):
+        return "Region('{0}')".format(','.join(self.Addresses(limit=None)))
+
+
+def _Bounds(addr: Address) -> tuple:
+    return addr.Row, addr.Column, addr.Row + addr.RowCount - 1, addr.Column + addr.ColumnCount - 1
+
+
+def _Runs(columns: list) -> tuple:
+    """
+    Collapse sorted unique columns into spans of consecutive columns
+    """
+    spans = list()
+    first = last = columns[0]
+    for column in columns[1:]:
+        if column != last + 1:
+            spans.append((first, last))
+            first = column
+        last = column
+
+    spans.append((first, last))
+    return tuple(spans)
+
+
+def _Merge(spans: list) -> tuple:
+    """
+    Merge sorted spans which overlap or adjoin each other
+    """
+    merged = list()
+    for l, r in spans:
+        if merged and l <= merged[-1][1] + 1:
+            if r > merged[-1][1]:
+                merged[-1] = (merged[-1][0], r)
+        else:
+            merged.append((l, r))
+
+    return tuple(merged)
+
+
+def _Append(bands: list, top: int, bottom: int, spans: tuple):
+    if not spans:
+        return
+
+    if bands and bands[-1][1] + 1 == top and bands[-1][2] == spans:
+        bands[-1] = (bands[-1][0], bottom, spans)
+    else:
+        bands.append((top, bottom, spans))
+
+
+def _Spans(a: tuple, b: tuple, keep) -> tuple:
+    """
+    Combine 2 sorted span lists, a column is kept when keep(in a, in b) is true
+    """
+    edges = sorted({l for l, _ in a + b} | {r + 1 for _, r in a + b})
+
+    spans = list()
+    i = j = 0
+    for start, stop in zip(edges, edges[1:]):
+        while i < len(a) and a[i][1] < start:
+            i += 1
+        while j < len(b) and b[j][1] < start:
+            j += 1
+
+        if keep(i < len(a) and a[i][0] <= start, j < len(b) and b[j][0] <= start):
+            if spans and spans[-1][1] + 1 == start:
+                spans[-1] = (spans[-1][0], stop - 1)
+            else:
+                spans.append((start, stop - 1))
+
+    return tuple(spans)
+
+
+def _Combine(a: Region, b: Region, keep) -> Region:
+    """
+    Combine 2 regions band by band, both regions are cut into elementary bands on every top and bottom edge
+    """
+    a, b = a.Bands, b.Bands
+    edges = sorted({t for t, _, _ in a + b} | {bottom + 1 for _, bottom, _ in a + b})
+
+    bands = list()
+    i = j = 0
+    for top, stop in zip(edges, edges[1:]):
+        while i < len(a) and a[i][1] < top:
+            i += 1
+        while j < len(b) and b[j][1] < top:
+            j += 1
+
+        spans_a = a[i][2] if i < len(a) and a[i][0] <= top else ()
+        spans_b = b[j][2] if j < len(b) and b[j][0] <= top else ()
+
+        _Append(bands, top, stop - 1, _Spans(spans_a, spans_b, keep))
+
+    return Region(bands)
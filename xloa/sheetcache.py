@@ -0,0 +1,355 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from array import array
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from timber import timber
+
+from . import emulator
+from .xlerror import XlError
+from .xlneuro import Range
+from .xlneuro import Sheet
+
+
+__magic__ = b'XLC3'
+__suffix__ = '.xlc'
+__epoch__ = datetime(1899, 12, 30)
+
+# Tags of cell values, the value itself is kept in numbers or strings of column. Dates with time zone, as com
+# gives, are kept as local time in numbers and offset to UTC in seconds in strings
+_NONE_, _FLOAT_, _INT_, _BOOL_, _DATE_, _STR_, _ZONED_ = range(7)
+
+
+class SheetCache(object):
+    """
+    On-disk cache of Worksheet values. UsedRange of a Worksheet is read once through com, and saved into a columnar
+    file in directory; later runs load the file through memory map instead of reading Worksheet again:
+        cache = SheetCache('.xlcache', limit=1 << 30)
+        sheet = cache.Open(app.Workbooks['data.xlsx'].Worksheets['Sheet1'])
+    Sheet returned works on cached values, and is read only. Files are keyed by FullName of Workbook and name of
+    Worksheet, and checked against the fingerprint of Workbook file (modified time and size), so a Workbook changed
+    since last run is read again. Workbook with unsaved changes is never cached. When the files grow over limit,
+    the least recently used ones are removed.
+    :param directory: where cache files are kept
+    :param limit: max total size of cache files in bytes
+    """
+    def __init__(self, directory: str, limit: int = 1 << 30):
+        self._directory = directory
+        self._limit = limit
+        self._application = emulator.Application()
+
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def Fingerprint(sheet: Sheet) -> str or None:
+        """
+        Fingerprint of the file of Workbook that Worksheet belongs to
+        :param sheet: Sheet instance
+        :return: str, or None when Workbook could not be cached
+        """
+        book = sheet.Api.Parent
+        if not book.Saved:
+            return None
+
+        try:
+            stat = os.stat(book.FullName)
+        except (OSError, ValueError):
+            return None
+
+        return '{0}:{1}'.format(stat.st_mtime_ns, stat.st_size)
+
+    def Path(self, sheet: Sheet) -> str:
+        """
+        Path of cache file of Worksheet
+        """
+        key = json.dumps((sheet.Api.Parent.FullName, sheet.Name), ensure_ascii=False)
+        return os.path.join(self._directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + __suffix__)
+
+    def Open(self, sheet: Sheet) -> Sheet:
+        """
+        Cached Worksheet, Worksheet is read and saved into cache when it is not cached or is out of date
+        :param sheet: Sheet instance
+        :return: Sheet instance on cached values, or sheet itself when Worksheet could not be cached
+        """
+        fingerprint = SheetCache.Fingerprint(sheet)
+        if fingerprint is None:
+            timber.info('Worksheet {0} is not cached, Workbook is not saved.'.format(sheet.Name))
+            return sheet
+
+        path = self.Path(sheet)
+        snapshot = self.Load(path, fingerprint)
+        if snapshot is None:
+            used = sheet.UsedRange
+            Store(path, fingerprint, sheet.Name, (used.Row, used.Column), Range.Matrix(used.Value))
+            self.Evict(keep=path)
+            snapshot = self.Load(path, fingerprint)
+            timber.info('Worksheet {0} is cached into {1}.'.format(sheet.Name, path))
+
+        return Sheet(snapshot)
+
+    def Load(self, path: str, fingerprint: str) -> 'Snapshot' or None:
+        """
+        Load cache file
+        :param path: path of cache file
+        :param fingerprint: fingerprint expected
+        :return: Snapshot instance, or None when there is no cache file, or it is out of date or broken
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as fp:
+            try:
+                buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file could not be mapped
+                timber.warning('Cache file {0} is broken, Worksheet is read again.'.format(path))
+                return None
+
+        header = _Header(buffer)
+        if header is None or header['fingerprint'] != fingerprint:
+            if header is None:
+                timber.warning('Cache file {0} is broken, Worksheet is read again.'.format(path))
+            buffer.close()
+            return None
+
+        # Modified time of file tells which is the least recently used
+        os.utime(path)
+        return Snapshot(self._application, header, buffer)
+
+    def Evict(self, keep: str = None):
+        """
+        Remove the least recently used cache files, until the total size is under limit
+        :param keep: path of file that should not be removed
+        :return: None
+        """
+        files = list()
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(__suffix__) and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self._limit:
+                break
+
+            if keep and os.path.samefile(path, keep):
+                continue
+
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                timber.warning('Cache file {0} is not removed: {1}'.format(path, e))
+
+    def Clear(self):
+        """
+        Remove all cache files
+        """
+        limit, self._limit = self._limit, 0
+        self.Evict()
+        self._limit = limit
+
+
+class Snapshot(emulator.Worksheet):
+    """
+    Read only Worksheet on cache file. Values are decoded from memory map on reading, cells out of the cached area
+    are blank.
+    """
+    def __init__(self, application: emulator.Application, header: dict, buffer: mmap.mmap):
+        super().__init__(application, None, header['sheet'])
+        self._buffer = buffer
+        self._origin = tuple(header['origin'])
+        self._shape = (header['rows'], len(header['columns']))
+
+        view = memoryview(buffer)
+        self._columns = list()
+        for tags, numbers, offsets, strings in header['columns']:
+            self._columns.append((view[tags[0]:tags[1]],
+                                  view[numbers[0]:numbers[1]].cast('d'),
+                                  view[offsets[0]:offsets[1]].cast('I'),
+                                  view[strings[0]:strings[1]]))
+
+    def _Get(self, row: int, column: int):
+        return self._Block(row, column, row, column)[0][0]
+
+    def _Set(self, row: int, column: int, value):
+        raise XlError('Cached worksheet is read only.')
+
+    def _SetColor(self, row: int, column: int, color: int or None):
+        raise XlError('Cached worksheet is read only.')
+
+    def _Block(self, row: int, column: int, last_row: int, last_column: int) -> tuple:
+        top, left = self._origin
+        rows, columns = self._shape
+
+        first, last = max(row - top, 0), min(last_row - top + 1, rows)
+        values = list()
+        for c in range(column - left, last_column - left + 1):
+            if 0 <= c < columns and first < last:
+                values.append([None] * (first - (row - top)) + self._Decode(c, first, last) +
+                              [None] * (last_row - top + 1 - max(last, first)))
+            else:
+                values.append([None] * (last_row - row + 1))
+
+        return tuple(zip(*values))
+
+    def _Decode(self, column: int, first: int, last: int) -> list:
+        tags, numbers, offsets, strings = self._columns[column]
+
+        values = numbers[first:last].tolist()
+        for i, tag in enumerate(tags[first:last]):
+            if tag == _FLOAT_:
+                continue
+            elif tag == _NONE_:
+                values[i] = None
+            elif tag == _INT_:
+                values[i] = int(values[i])
+            elif tag == _BOOL_:
+                values[i] = bool(values[i])
+            elif tag == _DATE_:
+                values[i] = __epoch__ + timedelta(days=values[i])
+            elif tag == _ZONED_:
+                k = first + i
+                offset = timedelta(seconds=int(str(strings[offsets[k]:offsets[k + 1]], 'utf-8')))
+                values[i] = (__epoch__ + timedelta(days=values[i])).replace(tzinfo=timezone(offset))
+            else:
+                k = first + i
+                values[i] = str(strings[offsets[k]:offsets[k + 1]], 'utf-8')
+
+        return values
+
+    def _Scan(self, row: int, column: int, last_row: int, last_column: int) -> list:
+        return self._ScanBlocks(row, column, last_row, last_column)
+
+    def _Used(self) -> tuple:
+        top, left = self._origin
+        rows, columns = self._shape
+        return top, left, top + max(rows, 1) - 1, left + max(columns, 1) - 1
+
+
+def Store(path: str, fingerprint: str, name: str, origin: tuple, values: tuple):
+    """
+    Save values into cache file, in columns. Each column is kept in 4 sections:
+        tags    - uint8 per cell, type of value
+        numbers - float64 per cell, value of numbers, bools and dates
+        offsets - uint32 per cell and 1 more, offsets of strings in utf-8
+        strings - utf-8 text of strings, and offsets of time zones of dates
+    The file begins with magic, length of header and the header in json, which gives the position of sections.
+    File is written into a temporary file and then replaced, so a broken file is never left.
+    :param path: path of cache file
+    :param fingerprint: fingerprint of Workbook file
+    :param name: name of Worksheet
+    :param origin: (row, column) of the first cell of values
+    :param values: tuple of row tuples
+    :return: None
+    """
+    sections = list()
+    for column in (zip(*values) if values else ()):
+        tags, numbers, offsets, strings = array('B'), array('d'), array('I', [0]), bytearray()
+        for value in column:
+            tag, number = _Encode(value)
+            if tag == _STR_:
+                strings += str(value).encode('utf-8')
+            elif tag == _ZONED_:
+                strings += str(int(value.utcoffset().total_seconds())).encode('utf-8')
+            tags.append(tag)
+            numbers.append(number)
+            offsets.append(len(strings))
+        sections.append((tags.tobytes(), numbers.tobytes(), offsets.tobytes(), bytes(strings)))
+
+    header = {
+        'fingerprint': fingerprint,
+        'sheet': name,
+        'origin': list(origin),
+        'rows': len(values),
+        'columns': list(),
+    }
+
+    # Sections are placed relative to the end of header, aligned to 8 bytes for memory view casting
+    position = 0
+    for section in sections:
+        spans = list()
+        for data in section:
+            spans.append((position, position + len(data)))
+            position = _Align(position + len(data))
+        header['columns'].append(spans)
+
+    body = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    start = _Align(len(__magic__) + 4 + len(body))
+
+    temp = path + '.saving'
+    with open(temp, 'wb') as fp:
+        fp.write(__magic__ + struct.pack('<I', len(body)) + body)
+        for section in sections:
+            for data in section:
+                fp.write(b'\0' * (start + _Align(fp.tell() - start) - fp.tell()))
+                fp.write(data)
+
+    try:
+        os.replace(temp, path)
+    except OSError as e:
+        # A cache file still mapped could not be replaced on Windows
+        timber.warning('Cache file {0} is not updated: {1}'.format(path, e))
+        os.remove(temp)
+
+
+def _Encode(value) -> (int, float):
+    # Blank text, e.g. given by formula, is kept as it is, not as blank cell
+    if value is None:
+        return _NONE_, 0.0
+
+    if isinstance(value, bool):
+        return _BOOL_, float(value)
+
+    if isinstance(value, int) and abs(value) < 1 << 53:
+        return _INT_, float(value)
+
+    if isinstance(value, float):
+        return _FLOAT_, value
+
+    if isinstance(value, datetime):
+        tag = _DATE_ if value.utcoffset() is None else _ZONED_
+        return tag, (value.replace(tzinfo=None) - __epoch__) / timedelta(days=1)
+
+    return _STR_, 0.0
+
+
+def _Header(buffer) -> dict or None:
+    """
+    Header of cache file, positions of sections in it are made absolute
+    :return: dict, or None when it is not a cache file, or the file is broken, e.g. truncated
+    """
+    if len(buffer) < len(__magic__) + 4 or buffer[:len(__magic__)] != __magic__:
+        return None
+
+    length, = struct.unpack_from('<I', buffer, len(__magic__))
+    start = _Align(len(__magic__) + 4 + length)
+    try:
+        header = json.loads(bytes(buffer[len(__magic__) + 4:len(__magic__) + 4 + length]).decode('utf-8'))
+        columns = [[(start + a, start + b) for a, b in spans] for spans in header['columns']]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    if any(key not in header for key in ('fingerprint', 'sheet', 'origin', 'rows')):
+        return None
+
+    if any(a > b or b > len(buffer) for spans in columns for a, b in spans):
+        return None
+
+    header['columns'] = columns
+    return header
+
+
+def _Align(position: int) -> int:
+    return (position + 7) & ~7
@@ -2,15 +2,34 @@
 # -*- coding: utf-8 -*-
 
 
-from win32com.client import Dispatch
-from pythoncom import com_error
+import re
+import threading
+
+from contextlib import contextmanager
 from functools import wraps
+from operator import getitem
+from types import BuiltinMethodType
+from types import FunctionType
+from types import MethodType
+from weakref import WeakValueDictionary
+from weakref import ref
 from timber import timber
 
 from .charts import Chart
 from .charts import Charts
 from .macro import Macro
 from .address import Address
+from .address import Encode
+from .constants import Calculation
+from .constants import Direction
+from .constants import FindLookIn
+from .constants import LookAt
+from .constants import SearchDirection
+from .constants import SearchOrder
+from .region import Region
+from .profiler import Instrument
+from .profiler import Unwrap
+from .profiler import __scalars__
 
 from .interior import ColorIndex
 from .interior import int_to_rgb
@@ -18,6 +37,16 @@ from .interior import rgb_to_int
 
 from .xlerror import XlError
 
+try:
+    from win32com.client import Dispatch
+    from pythoncom import com_error
+except ImportError:
+    # No com on this platform, App works only with the backend given by impl, e.g. emulator.Application
+    com_error = XlError
+
+    def Dispatch(cls_id):
+        raise XlError('Com object {0} is not available without pywin32.'.format(cls_id))
+
 
 def try_each(*tars):
 
@@ -42,18 +71,42 @@ class App(object):
     """
     The class that works as the agent between client and windows com object: Application.
     The instance of this
+    ProgID is resolved for each App, unless it is created with shared=True, then App instances share the same
+    dispatch in a thread, which is resolved again when Excel is gone. Dispatch is kept for each thread, as com
+    objects live in the apartment of the thread that creates them. Workbooks collection is kept by App, and
+    Workbooks looked up by name are kept by the collection as long as they are in use, so repeated lookups as
+    app.Workbooks[name].Worksheets[sheet] keep the wrappers and what they know, e.g. Location, without com call.
+    :param impl: com object of Application, or a backend such as emulator.Application
+    :param shared: share the dispatch with other App created with shared=True on the same thread
     """
+    __dispatch__ = threading.local()
 
-    def __init__(self, impl=None):
+    def __init__(self, impl=None, shared: bool = False):
         if impl:
-            self._impl = impl
+            self._impl = Instrument(impl)
+        elif shared:
+            dispatch = getattr(App.__dispatch__, 'impl', None)
+            if dispatch is None or not _Live(dispatch):
+                dispatch = App.__dispatch__.impl = self.Connect()
+            self._impl = Instrument(dispatch)
         else:
-            self._impl = self.Connect()
+            self._impl = Instrument(self.Connect())
+
+        self._fast = None
+        self._books = None
 
     @try_each('Excel.Application', 'Ket.Application')
     def Connect(self, cls_id):
         return Dispatch(cls_id)
 
+    @staticmethod
+    def Disconnect():
+        """
+        Forget the shared dispatch of this thread, the next App created with shared=True on it resolves ProgID
+        again. Thread that ends its com apartment should call it before CoUninitialize.
+        """
+        App.__dispatch__.impl = None
+
     @property
     def Api(self):
         """
@@ -68,19 +121,22 @@ class App(object):
 
     @property
     def ActiveWorkbook(self):
-        return Book(self.Api.ActiveWorkbook)
+        return Book(self.Api.ActiveWorkbook, self)
 
     @property
     def ActiveSheet(self):
-        return Sheet(self.Api.ActiveSheet)
+        return Sheet(self.Api.ActiveSheet, self)
 
     @property
     def Workbooks(self):
-        return Books(self.Api.Workbooks)
+        if self._books is None:
+            self._books = Books(self.Api.Workbooks, self)
+
+        return self._books
 
     @property
     def Worksheets(self):
-        return Sheets(self.Api.Worksheets)
+        return Sheets(self.Api.Worksheets, self)
 
     @property
     def Visible(self):
@@ -95,6 +151,48 @@ class App(object):
         """
         self.Api.Visible = visibility
 
+    @property
+    def ScreenUpdating(self) -> bool:
+        return self.Api.ScreenUpdating
+
+    @ScreenUpdating.setter
+    def ScreenUpdating(self, updating: bool):
+        self.Api.ScreenUpdating = updating
+
+    @property
+    def Calculation(self) -> int:
+        return self.Api.Calculation
+
+    @Calculation.setter
+    def Calculation(self, calculation: int):
+        self.Api.Calculation = calculation
+
+    @property
+    def EnableEvents(self) -> bool:
+        return self.Api.EnableEvents
+
+    @EnableEvents.setter
+    def EnableEvents(self, enabled: bool):
+        self.Api.EnableEvents = enabled
+
+    @property
+    def DisplayStatusBar(self) -> bool:
+        return self.Api.DisplayStatusBar
+
+    @DisplayStatusBar.setter
+    def DisplayStatusBar(self, display: bool):
+        self.Api.DisplayStatusBar = display
+
+    def FastMode(self):
+        """
+        Suspend screen updating, calculation, events and status bar of Excel in a block, see FastMode
+        :return: FastMode instance
+        """
+        if self._fast is None:
+            self._fast = FastMode(self)
+
+        return self._fast
+
     def Macro(self, name):
         """
         Runs a Sub or Function in Excel VBA that are not part of a specific workbook but e.g. are part of an add-in.
@@ -104,12 +202,90 @@ class App(object):
         return Macro(self, name)
 
 
+class FastMode(object):
+    """
+    Context in which Excel does not repaint screen, recalculate, fire events or update status bar, so that bulk
+    work is not slowed down by them:
+        with app.FastMode():
+            sheet.Range('A1:B100000').Value = values
+    Settings are saved on entering and restored on leaving, even when the block raises. Contexts could be nested,
+    only the outermost one changes and restores settings.
+    """
+    __settings__ = (('ScreenUpdating', False),
+                    ('Calculation', Calculation.xlCalculationManual),
+                    ('EnableEvents', False),
+                    ('DisplayStatusBar', False))
+
+    def __init__(self, app: App):
+        self._app = app
+        self._depth = 0
+        self._saved = list()
+
+    def __enter__(self):
+        self._depth += 1
+        if self._depth > 1:
+            return self._app
+
+        api = self._app.Api
+        for name, value in FastMode.__settings__:
+            try:
+                self._saved.append((name, getattr(api, name)))
+                setattr(api, name, value)
+            except com_error as e:
+                # e.g. Calculation could not be set when no Workbook is open
+                timber.warning('{0} is not changed in fast mode: {1}'.format(name, e))
+
+        return self._app
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+
+        self._Apply(reversed(self._saved), '{0} is not restored from fast mode: {1}')
+        self._saved.clear()
+
+    @property
+    def Active(self) -> bool:
+        return self._depth > 0
+
+    @contextmanager
+    def Paused(self):
+        """
+        Context in which settings saved by fast mode are restored for a while, e.g. VBA called back to show progress
+        in cells is repainted, while the bulk work around it is still in fast mode:
+            with app.FastMode().Paused():
+                result_call_back(0, progress)
+        It does nothing when fast mode is not active.
+        """
+        if not self.Active:
+            yield self._app
+            return
+
+        fast = dict(FastMode.__settings__)
+        self._Apply(reversed(self._saved), '{0} is not restored from fast mode: {1}')
+        try:
+            yield self._app
+        finally:
+            self._Apply(((name, fast[name]) for name, _ in self._saved), '{0} is not changed in fast mode: {1}')
+
+    def _Apply(self, settings, failure: str):
+        api = self._app.Api
+        for name, value in settings:
+            try:
+                setattr(api, name, value)
+            except com_error as e:
+                timber.error(failure.format(name, e))
+
+
 class Book(object):
     """
     CLass that represents a Workbook object
     """
-    def __init__(self, impl):
-        self._impl = impl
+    def __init__(self, impl, app: App = None):
+        self._impl = Instrument(impl)
+        self._app = app
+        self._sheets = None
 
     @property
     def Api(self):
@@ -125,7 +301,10 @@ class Book(object):
         The Application of Workbook
         :return: App instance
         """
-        return App(self.Api.Application)
+        if self._app is None:
+            self._app = App(self.Api.Application)
+
+        return self._app
 
     @property
     def Name(self) -> str:
@@ -149,7 +328,10 @@ class Book(object):
         Sheet collection of Workbook
         :return: Sheets instance
         """
-        return Sheets(self.Api.Worksheets)
+        if self._sheets is None:
+            self._sheets = Sheets(self.Api.Worksheets, self._app, self)
+
+        return self._sheets
 
     @property
     def ActiveSheet(self):
@@ -157,7 +339,7 @@ class Book(object):
         Active sheet of Workbook
         :return: Active sheet instance
         """
-        return Sheet(self.Api.ActiveSheet)
+        return Sheet(self.Api.ActiveSheet, self._app)
 
     @property
     def Charts(self) -> Charts:
@@ -180,20 +362,33 @@ class Books(object):
     """
     Class that represents Collection of all Workbooks
     """
-    def __init__(self, impl):
-        self._impl = impl
+    def __init__(self, impl, app: App = None):
+        self._impl = Instrument(impl)
+        self._app = app
+        self._named = WeakValueDictionary()
 
     def __getitem__(self, item) -> Book:
         """
-        Get an Workbook instance directly by index or id(name str)
+        Get an Workbook instance directly by index or id(name str), Workbook got by name is kept while it is in use,
+        and is got again after a com call through it fails, e.g. it is closed in Excel, see _Guard
         :param item: index(int) or id(name str) of the target Workbook
         :return: Workbook instance
         """
-        if isinstance(item, int) or isinstance(item, str):
-            return Book(self.Api.Item(item))
+        if isinstance(item, str):
+            book = self._named.get(item.lower())
+            if book is None:
+                book = _Guard.Of(Book(self.Api.Item(item), self._app), self)
+                self._named[item.lower()] = book
+            return book
+        elif isinstance(item, int):
+            return Book(self.Api.Item(item), self._app)
         else:
             raise XlError('Use <int> or <str> as subscript.')
 
+    def _Forget(self, book: Book):
+        for name in [k for k, v in self._named.items() if v is book]:
+            del self._named[name]
+
     def __iter__(self) -> iter:
         """
         Iterate through Workbooks
@@ -223,14 +418,17 @@ class Books(object):
 
     @property
     def Application(self) -> App:
-        return App(self.Api.Application)
+        if self._app is None:
+            self._app = App(self.Api.Application)
+
+        return self._app
 
     def Add(self) -> Book:
         """
         Add a workbook
         :return:
         """
-        book = Book(self.Api.Add())
+        book = Book(self.Api.Add(), self._app)
 
         if not self.Application.Visible:
             self.Application.Visible = True
@@ -241,6 +439,7 @@ class Books(object):
         """
         Close all opened Workbooks The Excel will popup a save dialogue when there are Workbooks modified
         """
+        self._named.clear()
         self.Api.Close()
 
     def Open(self, file_name: str) -> Book:
@@ -252,9 +451,10 @@ class Range(object):
     Range object
     """
     def __init__(self, impl):
-        self._impl = impl
-        self._row_count = impl.Rows.Count
-        self._column_count = impl.Columns.Count
+        self._impl = Instrument(impl)
+        self._origin = None
+        self._location = None
+        self._address = None
 
     @property
     def Api(self):
@@ -274,23 +474,46 @@ class Range(object):
         Only used cells in Worksheet, this is included in a rectangle area
         :return:
         """
-        return self.Api.Address
+        if self._address is None:
+            location = self.Location
+            if self._address is None:
+                self._address = location.Absolute
+
+        return self._address
+
+    @property
+    def Location(self) -> Address:
+        """
+        Address of the Range(the 1st area of Range) in Worksheet. It is not fetched until it is used, and then kept
+        for Row, Column, RowCount and ColumnCount. It is worked out from the Range that generates this Range when
+        possible, otherwise all of them are fetched from com object at once, by only one call on Address.
+        :return: Address instance
+        """
+        if self._location is None:
+            if self._origin:
+                self._location = self._origin[0].Locate(*self._origin[1:])
+
+            if self._location is None:
+                self._address = self.Api.Address
+                self._location = Address(addr=self._address.split(',')[0])
+
+        return self._location
 
     @property
     def Row(self):
-        return self.Api.Row
+        return self.Location.Row
 
     @property
     def Column(self):
-        return self.Api.Column
+        return self.Location.Column
 
     @property
     def RowCount(self):
-        return self._row_count
+        return self.Location.RowCount
 
     @property
     def ColumnCount(self):
-        return self._column_count
+        return self.Location.ColumnCount
 
     @property
     def Rows(self):
@@ -298,7 +521,7 @@ class Range(object):
         All Rows in Worksheet
         :return:
         """
-        return Rows(self._impl.Rows)
+        return self.Child(Rows(self._impl.Rows))
 
     @property
     def Columns(self):
@@ -306,7 +529,56 @@ class Range(object):
         All Columns in Worksheet
         :return:
         """
-        return Columns(self._impl.Columns)
+        return self.Child(Columns(self._impl.Columns))
+
+    def Child(self, rng, *coords):
+        """
+        Mark Range as a part of this Range, so that its Location could be worked out from this Range without com
+        call, see Locate
+        :param rng: Range object generated from this Range
+        :param coords: coordinates of rng relative to this Range, see Locate
+        :return: rng itself
+        """
+        rng._origin = (self, ) + coords
+        return rng
+
+    def _Child(self, rng, offsets: tuple or None):
+        # Child by coordinates from Offsets, rng is left to fetch its own Location when they are not known
+        if offsets is None:
+            return rng
+
+        return self.Child(rng, *offsets)
+
+    def Locate(self, *coords) -> Address or None:
+        """
+        Get the Address in Worksheet of cells given relative to this Range
+        :param coords: in one of following forms:
+            ()                                      - the Range itself
+            (index, )                               - index of cell, from left to right and then next row
+            (row, column, last row, last column)    - the rectangle, None for last row or column of this Range
+        :return: Address instance, or None when the cells go beyond Worksheet
+        """
+        location = self.Location
+        if not coords:
+            return location
+
+        if len(coords) == 1:
+            row, column = location.CoordOf(coords[0])
+            last_row, last_column = row, column
+        else:
+            row, column, last_row, last_column = coords
+
+        if last_row is None:
+            last_row = location.RowCount
+
+        if last_column is None:
+            last_column = location.ColumnCount
+
+        if min(row, column, last_row, last_column) < 1:
+            return None
+
+        top, left = location.Row - 1, location.Column - 1
+        return Address.Of(top + row, left + column, top + last_row, left + last_column)
 
     @property
     def Count(self):
@@ -357,18 +629,19 @@ class Range(object):
         :return: Range object
         """
         if len(args) == 0:
-            return Range(self.Api.Cells)
+            return self.Child(Range(self.Api.Cells))
 
         if len(args) > 2:
             raise XlError('Use (int, int)[, (int, int)] matrix syntax.')
 
         if len(args) == 1 or all(isinstance(k, int) for k in args):
-            return Range(self.Api.Cells(*args))
+            return self._Child(Range(self.Api.Cells(*args)), Range.Offsets(*args))
 
         if any(not isinstance(k, (list, tuple)) for k in args):
             raise XlError()
 
-        return Range(self.Api.Range(Address(matrix=args).Address))
+        addr = Address(matrix=args)
+        return self._Child(Range(self.Api.Range(addr.Address)), Range.Offsets(addr))
 
     def __getitem__(self, indices):
         """
@@ -414,7 +687,8 @@ class Range(object):
 
                 matrix = ((min(ep1[0], ep2[0]), min(ep1[1], ep2[1])), (max(ep1[0], ep2[0]), max(ep1[1], ep2[1])))
 
-                return Range(self.Api.Range(Address(matrix=matrix).Address))
+                addr = Address(matrix=matrix)
+                return self._Child(Range(self.Api.Range(addr.Address)), Range.Offsets(addr))
 
         raise XlError('Use int, str or slice(tuple(int, int): tuple(int, int)) as subscriber.')
 
@@ -431,7 +705,78 @@ class Range(object):
         :return: Range Object
         """
         for i in range(self.Count):
-            yield Range(self.Api.Item(i + 1))
+            yield self.Child(Range(self.Api.Item(i + 1)), i + 1)
+
+    @staticmethod
+    def Offsets(*coords) -> tuple or None:
+        """
+        Convert coordinates used by Cells, Item or Range method into the form accepted by Locate
+        :param coords: index, (row, column), or Address instance relative to the Range
+        :return: coordinates for Locate, or None when they could not be converted, e.g. whole rows or columns
+        """
+        if len(coords) == 1 and isinstance(coords[0], Address):
+            addr = coords[0]
+            if addr.IsRow or addr.IsColumn:
+                return None
+
+            return addr.Row, addr.Column, addr.Row + addr.RowCount - 1, addr.Column + addr.ColumnCount - 1
+
+        if len(coords) == 1 and isinstance(coords[0], (tuple, list)):
+            coords = tuple(coords[0])
+
+        if not all(isinstance(c, int) for c in coords):
+            return None
+
+        if len(coords) == 1:
+            return coords
+
+        if len(coords) == 2:
+            return coords[0], coords[1], coords[0], coords[1]
+
+        return None
+
+    def Snapshot(self):
+        """
+        Return an iterator for cells in Range, which reads Value of the whole Range only once, and then yields
+        CellView objects in order from left to right and then next row. No com object is created for a cell, unless
+        it is written through the view.
+        :return: Generator of CellView objects
+        """
+        # Location is worked out from the Range that generates this Range, or fetched by one call at most
+        location = self.Location
+        row, column = location.Row, location.Column
+
+        for i, values in enumerate(Range.Matrix(self.Value), 1):
+            for j, value in enumerate(values, 1):
+                yield CellView(self, i, j, row + i - 1, column + j - 1, value)
+
+    @staticmethod
+    def Matrix(value) -> tuple:
+        """
+        Normalize Value of Range into 2d tuple, Value of single cell is returned by com object as a scalar
+        :param value: Value of Range
+        :return: tuple of row tuples
+        """
+        if isinstance(value, tuple):
+            return value
+
+        return (value, ),
+
+    @staticmethod
+    def Trim(*values) -> tuple:
+        """
+        Drop blank rows at the end of values read from Ranges in same rows, e.g. rows of formulas that give ''
+        :param values: 2d tuples of Value, see Matrix
+        :return: tuple of values, all cut after the last row that has value in any of them
+        """
+        rows = 0
+        for value in values:
+            for i in range(len(value), rows, -1):
+                if any(v is not None and v != '' for v in value[i - 1]):
+                    rows = i
+                    break
+
+        return tuple(value[:rows] for value in values)
 
     @staticmethod
     def Coordinates(*coord, row: int = 1, column: int = 1, row_count: int = 0, column_count: int = 0) -> tuple:
@@ -486,7 +831,12 @@ class Range(object):
             else:
                 raise XlError('Must be 2 Range objects as endpoints.')
 
-        return Range(self.Api.Range(*endpoints))
+        rng = Range(self.Api.Range(*endpoints))
+
+        # Only plain A1 reference is located here, defined names, references to other Worksheets, whole rows or
+        # columns and the like are left to com object
+        addr = _Area(endpoints[0]) if len(endpoints) == 1 and isinstance(endpoints[0], str) else None
+        return self._Child(rng, Range.Offsets(addr) if addr else None)
 
     def Cells(self, *coords):
         """
@@ -500,7 +850,7 @@ class Range(object):
         :return: Range Object it self
         """
         if len(coords) == 0:
-            return Range(self.Api.Cells)
+            return self.Child(Range(self.Api.Cells))
 
         if len(coords) > 2:
             raise XlError('Use (int, int)[, (int, int)] matrix syntax.')
@@ -508,7 +858,7 @@ class Range(object):
         if any(not isinstance(k, int) for k in coords):
             raise XlError('Cells method only accepts int as input.')
 
-        return Range(self.Api.Cells(*coords))
+        return self._Child(Range(self.Api.Cells(*coords)), Range.Offsets(*coords))
 
     def Item(self, *coords):
         """
@@ -531,7 +881,7 @@ class Range(object):
         if not all(isinstance(k, int) for k in coords):
             raise XlError('')
 
-        return Range(self.Api.Item(*coords))
+        return self._Child(Range(self.Api.Item(*coords)), Range.Offsets(*coords))
 
     @property
     def Color(self):
@@ -550,17 +900,99 @@ class Range(object):
             self.Api.Interior.Color = rgb_to_int(color_or_rgb)
 
 
+class CellView(object):
+    """
+    A cell read from the Value snapshot of a Range. Reading from the view costs no com call, the com object of the
+    cell is only created when the cell is written.
+    """
+    __slots__ = ('_parent', '_offset', '_row', '_column', '_value')
+
+    def __init__(self, parent: Range, i: int, j: int, row: int, column: int, value):
+        self._parent = parent
+        self._offset = (i, j)
+        self._row = row
+        self._column = column
+        self._value = value
+
+    def __repr__(self):
+        return 'CellView({0}, {1}, {2!r})'.format(self._row, self._column, self._value)
+
+    @property
+    def Row(self) -> int:
+        return self._row
+
+    @property
+    def Column(self) -> int:
+        return self._column
+
+    @property
+    def Value(self):
+        """
+        Value of cell, as it was when the snapshot was taken or last written through this view
+        :return: Value
+        """
+        return self._value
+
+    @Value.setter
+    def Value(self, value):
+        self.Range.Value = value
+        self._value = value
+
+    @property
+    def Color(self):
+        return self.Range.Color
+
+    @Color.setter
+    def Color(self, color_or_rgb):
+        self.Range.Color = color_or_rgb
+
+    @property
+    def Range(self) -> Range:
+        """
+        Materialize com object of the cell
+        :return: Range object
+        """
+        return Range(self._parent.Api.Cells(*self._offset))
+
+
 class Sheet(Range):
     """
     Class represents Worksheet object in Workbook
     """
+    def __init__(self, impl, app: App = None, sheets: 'Sheets' = None):
+        super().__init__(impl)
+        self._app = app
+        self._sheets = sheets
+
+    @property
+    def Location(self) -> Address:
+        """
+        Worksheet has no Address, its Location covers all cells in Worksheet
+        :return: Address instance
+        """
+        if self._location is None:
+            self._location = Address.Of(1, 1, self.Api.Rows.Count, self.Api.Columns.Count)
+
+        return self._location
+
+    @property
+    def Row(self):
+        return 1
+
+    @property
+    def Column(self):
+        return 1
+
     @property
     def Application(self) -> App:
         """
         The Application of Workbook
         :return: App instance
         """
-        return App(self.Api.Application)
+        if self._app is None:
+            self._app = App(self.Api.Application)
+
+        return self._app
 
     @property
     def Name(self) -> str:
@@ -578,6 +1010,8 @@ class Sheet(Range):
         :return: None
         """
         self.Api.Name = name
+        if self._sheets is not None:
+            self._sheets._Rename(self, name)
 
     @property
     def UsedRange(self):
@@ -587,25 +1021,215 @@ class Sheet(Range):
         """
         return Range(self.Api.UsedRange)
 
+    def LastRow(self, column: int) -> int:
+        """
+        Last row that has value in column, by End(xlUp) from the bottom of Worksheet as Ctrl + Up does. Unlike
+        UsedRange, it is not extended by cells only formatted or cleared. Rows hidden by filter are skipped by End,
+        see DataExtent for Worksheet that could be filtered
+        :param column: column number
+        :return: row number, 0 for a blank column
+        """
+        bottom = self.Api.Cells(self.Api.Rows.Count, column)
+        if bottom.Value not in (None, ''):
+            return bottom.Row
+
+        end = bottom.End(Direction.xlUp)
+        if end.Row == 1 and end.Value in (None, ''):
+            return 0
+
+        return end.Row
+
+    def DataExtent(self, address: str = None) -> tuple:
+        """
+        Last row and last column that have value in an area, by 2 calls of Find('*') backwards, by rows and by
+        columns. Find searches formulas and hidden rows, and only the used part of area is searched by Excel
+        :param address: address of area, the whole Worksheet by default
+        :return: (last row, last column), (0, 0) for a blank area
+        """
+        if address is None:
+            area = self.Api.Cells
+        else:
+            area = self.Api.Range(address)
+            addr = Address(addr=address)
+            if addr.IsCell:
+                # Find on a single cell searches the whole Worksheet
+                return (addr.Row, addr.Column) if area.Value not in (None, '') else (0, 0)
+
+        found = dict()
+        for order in (SearchOrder.xlByRows, SearchOrder.xlByColumns):
+            found[order] = area.Find(What='*', LookIn=FindLookIn.xlFormulas, LookAt=LookAt.xlPart,
+                                     SearchOrder=order, SearchDirection=SearchDirection.xlPrevious)
+            if found[order] is None:
+                return 0, 0
+
+        return found[SearchOrder.xlByRows].Row, found[SearchOrder.xlByColumns].Column
+
+    def WriteBehind(self, limit: int or None = 10000):
+        """
+        Start a write-behind session on Worksheet, see WriteBehind
+        :param limit: number of buffered writes that triggers flush automatically, None to flush only on exit
+        :return: WriteBehind instance
+        """
+        return WriteBehind(self, limit)
+
+
+class WriteBehind(object):
+    """
+    Session that buffers writes of Value and interior Color on a Worksheet, and writes them to Excel in bulk:
+        Values are grouped into rectangular blocks of cells, each block is assigned by one Value = ((...), ) call.
+        Colors are grouped by color, cells in same color are colored by one call on a multi-area Range.
+    Buffered writes are flushed when the number of them reaches the limit, when Flush() is called, and on exit of
+    context manager. Reading cells through com object does not see the writes still buffered.
+        with sheet.WriteBehind() as session:
+            session.SetValue((1, 1), 'A')
+            session.SetColor('A1:B2', (255, 0, 0))
+    """
+    def __init__(self, sheet: Sheet, limit: int or None = 10000):
+        self._sheet = sheet
+        self._limit = limit
+        self._values = dict()
+        self._colors = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.Flush()
+
+    def __len__(self):
+        """
+        Number of buffered writes
+        :return: count of cells in buffer
+        """
+        return len(self._values) + len(self._colors)
+
+    def SetValue(self, target, value):
+        """
+        Buffer Value of cells
+        :param target: cells to write, in one of following forms:
+            tuple - (row, column) of a cell in Worksheet
+            str or Address - address of a rectangle, e.g. 'A1:B2'
+            Range - Range object in this Worksheet
+        :param value: a scalar for all cells in target, or rows of values in shape of target
+        :return: None
+        """
+        row, column, cells = WriteBehind.Cells(target)
+
+        if isinstance(value, (tuple, list)):
+            for r, c in cells:
+                self._values[(r, c)] = value[r - row][c - column]
+        else:
+            for cell in cells:
+                self._values[cell] = value
+
+        self._Check()
+
+    def SetColor(self, target, color_or_rgb):
+        """
+        Buffer interior Color of cells
+        :param target: cells to color, see SetValue
+        :param color_or_rgb: int color, (r, g, b) tuple or None for no color
+        :return: None
+        """
+        if color_or_rgb is not None and not isinstance(color_or_rgb, int):
+            color_or_rgb = rgb_to_int(color_or_rgb)
+
+        for cell in WriteBehind.Cells(target)[2]:
+            self._colors[cell] = color_or_rgb
+
+        self._Check()
+
+    def Flush(self):
+        """
+        Write all buffered Values and Colors to Worksheet
+        :return: None
+        """
+        values, colors = self._values, self._colors
+        self._values, self._colors = dict(), dict()
+
+        for row, column, last_row, last_column in Region.FromCells(values).Rectangles():
+            block = tuple(tuple(values[(r, c)] for c in range(column, last_column + 1))
+                          for r in range(row, last_row + 1))
+            self._sheet.Api.Range(Encode((row, column), (last_row, last_column))).Value = block
+
+        groups = dict()
+        for cell, color in colors.items():
+            groups.setdefault(color, list()).append(cell)
+
+        for color, cells in groups.items():
+            for address in Region.FromCells(cells).Addresses():
+                interior = self._sheet.Api.Range(address).Interior
+                if color is None:
+                    interior.ColorIndex = ColorIndex.xlColorIndexNone
+                else:
+                    interior.Color = color
+
+    def _Check(self):
+        if self._limit is not None and len(self) >= self._limit:
+            self.Flush()
+
+    @staticmethod
+    def Cells(target) -> tuple:
+        """
+        Resolve target of write into cells
+        :param target: see SetValue
+        :return: (first row, first column, list of (row, column))
+        """
+        if isinstance(target, tuple) and len(target) == 2 and all(isinstance(i, int) for i in target):
+            return target[0], target[1], [target]
+
+        if isinstance(target, Range):
+            target = target.Location
+
+        if isinstance(target, str):
+            target = Address(addr=target)
+
+        if not isinstance(target, Address):
+            raise XlError('Use (row, column), address or Range object as target.')
+
+        region = Region.Rectangle(target.Row, target.Column,
+                                  target.Row + target.RowCount - 1, target.Column + target.ColumnCount - 1)
+        return target.Row, target.Column, list(region)
+
 
 class Sheets(object):
     """
     Class represents Collection of all Worksheets in Workbook
     """
-    def __init__(self, impl):
-        self._impl = impl
+    def __init__(self, impl, app: App = None, book: Book = None):
+        self._impl = Instrument(impl)
+        self._app = app
+        # Workbook is kept alive by its Worksheets in use, so that it is found again by name
+        self._book = book
+        self._named = WeakValueDictionary()
 
     def __getitem__(self, item):
         """
-        Get an Worksheet instance directly by index or id(name str)
+        Get an Worksheet instance directly by index or id(name str), Worksheet got by name is kept while it is in
+        use, and is got again after a com call through it fails, e.g. it is deleted in Excel, see _Guard
         :param item: index(int) or id(name str) of the target Worksheet
         :return: Worksheet instance
         """
-        if isinstance(item, int) or isinstance(item, str):
-            return Sheet(self.Api[item])
+        if isinstance(item, str):
+            sheet = self._named.get(item.lower())
+            if sheet is None:
+                sheet = _Guard.Of(Sheet(self.Api[item], self._app, self), self)
+                self._named[item.lower()] = sheet
+            return sheet
+        elif isinstance(item, int):
+            return Sheet(self.Api[item], self._app, self)
         else:
             raise XlError('Use <int> or <str> as subscript.')
 
+    def _Rename(self, sheet: Sheet, name: str):
+        # Worksheet renamed is found by its new name only
+        self._Forget(sheet)
+        self._named[name.lower()] = sheet
+
+    def _Forget(self, sheet: Sheet):
+        for name in [k for k, v in self._named.items() if v is sheet]:
+            del self._named[name]
+
     def __iter__(self):
         """
         Iterate through Workbooks
@@ -635,7 +1259,10 @@ class Sheets(object):
 
     @property
     def Application(self):
-        return App(self.Api.Application)
+        if self._app is None:
+            self._app = App(self.Api.Application)
+
+        return self._app
 
     def Add(self, name: str = None):
         """
@@ -643,7 +1270,7 @@ class Sheets(object):
         :param name:
         :return:
         """
-        sheet = Sheet(self.Api.Add())
+        sheet = Sheet(self.Api.Add(), self._app, self)
         if name:
             sheet.Name = name
         return sheet
@@ -664,7 +1291,7 @@ class Rows(Range):
 
     def __call__(self, *args, **kwargs):
         if len(args) == 1 and isinstance(args[0], int):
-            return Rows(self.Api.Rows(args[0]))
+            return self.Child(Rows(self.Api.Rows(args[0])), args[0], 1, args[0], None)
 
         return super().__call__(*args)
 
@@ -674,7 +1301,7 @@ class Rows(Range):
         :return: Range Object
         """
         for i in range(self.Count):
-            yield Rows(self.Api.Item(i + 1))
+            yield self.Child(Rows(self.Api.Item(i + 1)), i + 1, 1, i + 1, None)
 
     def __getitem__(self, indices):
         """
@@ -699,7 +1326,8 @@ class Rows(Range):
                 if addr.Row + addr.RowCount > self.RowCount:
                     raise XlError('Index of row out of range.')
 
-                return Rows(self.Api.Rows(addr.Address))
+                return self.Child(Rows(self.Api.Rows(addr.Address)),
+                                  addr.Row, 1, addr.Row + addr.RowCount - 1, None)
 
             return self.Range(indices)
 
@@ -713,8 +1341,8 @@ class Rows(Range):
             if indices.stop and indices.stop > self.RowCount:
                 raise XlError('Index of row out of range.')
 
-            matrix = ((indices.start or 1, 1), (indices.stop or self.Count, self.ColumnCount))
-            return Rows(self.Api.Range(Address(matrix=matrix).Address).Rows)
+            addr = Address(matrix=((indices.start or 1, 1), (indices.stop or self.Count, self.ColumnCount)))
+            return self._Child(Rows(self.Api.Range(addr.Address).Rows), Range.Offsets(addr))
 
         raise XlError('Invalid indices type.')
 
@@ -735,7 +1363,11 @@ class Rows(Range):
         self.Api.Rows.Value = value
 
     def Item(self, item):
-        return Rows(self.Api.Rows(item))
+        rng = Rows(self.Api.Rows(item))
+        if isinstance(item, int):
+            self.Child(rng, item, 1, item, None)
+
+        return rng
 
 
 class Columns(Range):
@@ -748,7 +1380,7 @@ class Columns(Range):
 
     def __call__(self, *args, **kwargs):
         if len(args) == 1 and isinstance(args[0], int):
-            return Columns(self.Api.Columns(args[0]))
+            return self.Child(Columns(self.Api.Columns(args[0])), 1, args[0], None, args[0])
 
         return super().__call__(*args)
 
@@ -758,7 +1390,7 @@ class Columns(Range):
         :return: Range Object
         """
         for i in range(self.Count):
-            yield Columns(self.Api.Item(i + 1))
+            yield self.Child(Columns(self.Api.Item(i + 1)), 1, i + 1, None, i + 1)
 
     def __getitem__(self, indices):
         """
@@ -784,7 +1416,8 @@ class Columns(Range):
                 if addr.Column + addr.ColumnCount > self.ColumnCount:
                     raise XlError('Index of column out of range.')
 
-                return Columns(self.Api.Columns(addr.Address))
+                return self.Child(Columns(self.Api.Columns(addr.Address)),
+                                  1, addr.Column, None, addr.Column + addr.ColumnCount - 1)
 
             return self.Range(indices)
 
@@ -798,8 +1431,8 @@ class Columns(Range):
             if indices.stop and indices.stop > self.ColumnCount:
                 raise XlError('Index of column out of range.')
 
-            matrix = ((1, indices.start or 1), (self.RowCount, indices.stop or self.Count))
-            return Columns(self.Api.Range(Address(matrix=matrix).Address).Columns)
+            addr = Address(matrix=((1, indices.start or 1), (self.RowCount, indices.stop or self.Count)))
+            return self._Child(Columns(self.Api.Range(addr.Address).Columns), Range.Offsets(addr))
 
         raise XlError('Invalid indices type')
 
@@ -820,4 +1453,113 @@ class Columns(Range):
         self.Api.Columns.Value = value
 
     def Item(self, item):
-        return Columns(self.Api.Columns(item))
+        rng = Columns(self.Api.Columns(item))
+        if isinstance(item, int):
+            self.Child(rng, 1, item, None, item)
+
+        return rng
+
+
+class _Guard(object):
+    """
+    Proxy of com object of a wrapper cached by name, and of com objects got through it. The wrapper is reused by
+    lookups without any com call, until a com call through it fails, e.g. Workbook is closed or Worksheet is deleted
+    in Excel, then it is dropped from the cache and got again by the next lookup.
+    """
+    __slots__ = ('_impl', '_cache', '_wrapper')
+
+    def __init__(self, impl, cache, wrapper: ref):
+        object.__setattr__(self, '_impl', impl)
+        object.__setattr__(self, '_cache', cache)
+        object.__setattr__(self, '_wrapper', wrapper)
+
+    @staticmethod
+    def Of(wrapper, cache):
+        """
+        Guard com object of wrapper
+        :param wrapper: Book or Sheet instance
+        :param cache: Books or Sheets that caches wrapper, it is told to forget wrapper by _Forget
+        :return: wrapper itself
+        """
+        wrapper._impl = Instrument(_Guard(Unwrap(wrapper._impl), cache, ref(wrapper)))
+        return wrapper
+
+    def __getattr__(self, name):
+        value = self._Try(getattr, self._impl, name)
+
+        # A bound method is looked up locally, the com call happens when it is called
+        if isinstance(value, __methods__) and not hasattr(value, '_oleobj_'):
+            return lambda *args, **kwargs: self._Call(value, args, kwargs)
+
+        return value
+
+    def __setattr__(self, name, value):
+        self._Try(setattr, self._impl, name, _Unguard(value))
+
+    def __call__(self, *args, **kwargs):
+        return self._Call(self._impl, args, kwargs)
+
+    def __getitem__(self, item):
+        return self._Try(getitem, self._impl, _Unguard(item))
+
+    def __repr__(self):
+        return '_Guard({0!r})'.format(self._impl)
+
+    def _Call(self, func, args: tuple, kwargs: dict):
+        # Com objects passed to com call must be the original ones
+        return self._Try(func, *(_Unguard(a) for a in args), **dict((k, _Unguard(v)) for k, v in kwargs.items()))
+
+    def _Try(self, func, *args, **kwargs):
+        try:
+            value = func(*args, **kwargs)
+        except com_error:
+            wrapper = self._wrapper()
+            if wrapper is not None:
+                self._cache._Forget(wrapper)
+            raise
+
+        if isinstance(value, __scalars__) or isinstance(value, __methods__):
+            return value
+
+        return _Guard(value, self._cache, self._wrapper)
+
+
+def _Unguard(value):
+    while isinstance(value, _Guard):
+        value = value._impl
+
+    return value
+
+
+def _Live(impl) -> bool:
+    """
+    Whether com object kept by xloa is still there, e.g. it is not gone with Excel
+    """
+    try:
+        impl.Name
+    except (com_error, XlError, AttributeError):
+        return False
+
+    return True
+
+
+def _Area(text: str) -> Address or None:
+    """
+    Address of plain A1 reference to a cell or an area in Worksheet, e.g. 'A1' or '$A$1:$B$2'
+    :return: Address instance, or None for any other reference
+    """
+    if not __area__.match(text):
+        return None
+
+    addr = Address(addr=text)
+    row, column, last_row, last_column = addr.Coordinates
+    if not (row <= last_row <= __rows__ and column <= last_column <= __columns__):
+        return None
+
+    return addr
+
+
+__area__ = re.compile(r'^\$?[A-Z]{1,3}\$?[1-9][0-9]*(:\$?[A-Z]{1,3}\$?[1-9][0-9]*)?$', re.IGNORECASE)
+__rows__ = 1048576
+__columns__ = 16384
+__methods__ = (MethodType, FunctionType, BuiltinMethodType)
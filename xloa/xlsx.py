@@ -0,0 +1,739 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+
+import codecs
+import os
+import posixpath
+import re
+import shutil
+import zipfile
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from xml.etree.ElementTree import Element
+from xml.etree.ElementTree import SubElement
+from xml.etree.ElementTree import fromstring
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape
+
+from timber import timber
+
+from . import emulator
+from .address import Address
+from .address import Encode
+from .address import Letter2Int26
+from .constants import CVError
+from .xlerror import XlError
+
+
+_MAIN_ = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_RELATIONSHIP_ = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_ = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XML_ = 'http://www.w3.org/XML/1998/namespace'
+
+_ROW_ = '{%s}row' % _MAIN_
+_CELL_ = '{%s}c' % _MAIN_
+_VALUE_ = '{%s}v' % _MAIN_
+_INLINE_ = '{%s}is' % _MAIN_
+_TEXT_ = '{%s}t' % _MAIN_
+_RUN_ = '{%s}r' % _MAIN_
+_SHEET_DATA_ = '{%s}sheetData' % _MAIN_
+_DIMENSION_ = '{%s}dimension' % _MAIN_
+
+# Error values in file, by the text Excel writes
+_ERRORS_ = {
+    '#NULL!': CVError.xlErrNull, '#DIV/0!': CVError.xlErrDiv0, '#VALUE!': CVError.xlErrValue,
+    '#REF!': CVError.xlErrRef, '#NAME?': CVError.xlErrName, '#NUM!': CVError.xlErrNum, '#N/A': CVError.xlErrNA,
+    '#GETTING_DATA': CVError.xlErrGettingData, '#SPILL!': CVError.xlErrSpill, '#CONNECT!': CVError.xlErrConnect,
+    '#BLOCKED!': CVError.xlErrBlocked, '#UNKNOWN!': CVError.xlErrUnknown, '#FIELD!': CVError.xlErrField,
+    '#CALC!': CVError.xlErrCalc,
+}
+
+# Built-in number formats of date and time
+_DATE_FORMATS_ = frozenset(list(range(14, 23)) + list(range(27, 37)) + list(range(45, 48)) + list(range(50, 59)))
+
+_HEAD_ = re.compile(r'<(\w+:)?sheetData\b[^>]*?(/?)>')
+_ROOT_ = re.compile(r'<(?:\w+:)?worksheet\b([^>]*)>')
+_NAMESPACE_ = re.compile(r'xmlns(?::(\w+))?="([^"]*)"')
+_ROW_NUMBER_ = re.compile(r'\br="(\d+)"')
+_DIMENSION_TEXT_ = re.compile(r'(<(?:\w+:)?dimension\b[^>]*?\bref=")([^"]*)(")')
+_CALC_CHAIN_ = re.compile(r'<(?:Override|Relationship)\b[^>]*calcChain[^>]*/>')
+
+_CHUNK_ = 1 << 20
+
+
+class Application(emulator.Application):
+    """
+    Backend that works on .xlsx/.xlsm files directly, without Excel. It provides the same object model as emulator
+    does, so xloa works on files in the same way as on Excel:
+        app = App(impl=Application())
+        book = Book(app.Workbooks.Api.Open('data.xlsx'))
+    Worksheets are streamed from the file row by row when they are read, so the memory does not grow with the size
+    of Worksheet. Values written are kept in memory, and merged into the file on Save/SaveAs, also in streaming.
+    Only values are saved, interior colors are not written to file.
+    """
+    def __init__(self):
+        super().__init__()
+        self._books = Workbooks(self)
+
+
+class Workbooks(emulator.Workbooks):
+    def Add(self, name: str = None):
+        raise XlError('Creating workbook is not supported by file backend.')
+
+    def Open(self, file_name: str):
+        book = Workbook(self._application, file_name)
+        self._books.append(book)
+        return book
+
+
+class Workbook(emulator.Workbook):
+    def __init__(self, application: Application, file_name: str):
+        self._application = application
+        self._name = os.path.basename(file_name)
+        self._full_name = os.path.abspath(file_name)
+        self._package = Package(self._full_name)
+        self._sheets = emulator.Worksheets(application, self)
+
+        for name, part in self._package.Sheets:
+            self._sheets._sheets.append(Worksheet(application, self, name, part))
+
+    @property
+    def Saved(self):
+        return not any(sheet._cells for sheet in self._sheets._sheets)
+
+    def Save(self):
+        self.SaveAs(self._full_name)
+
+    def SaveAs(self, file_name: str):
+        """
+        Save workbook with values written merged in
+        :param file_name: path of file to save
+        :return: None
+        """
+        sheets = self._sheets._sheets
+        if any(sheet._colors for sheet in sheets):
+            timber.warning('Interior colors are not saved by file backend: {0}'.format(self._name))
+
+        self._package.Save(file_name, dict((s._part, s._cells) for s in sheets if s._cells))
+
+        self._full_name = os.path.abspath(file_name)
+        self._name = os.path.basename(file_name)
+        self._package = Package(self._full_name)
+        for sheet in sheets:
+            sheet._Reset()
+
+    def Close(self, *args):
+        self._package.Close()
+        super().Close()
+
+
+class Worksheet(emulator.Worksheet):
+    """
+    Worksheet in file, values are read from file on demand, and values written are kept in memory as overlay on
+    file. Blank cell written is kept in overlay as None, so that it hides the value in file.
+    """
+    def __init__(self, application: Application, book: Workbook, name: str, part: str):
+        super().__init__(application, book, name)
+        self._part = part
+        self._stream = None
+        self._dimension = None
+
+    def _Reset(self):
+        if self._stream:
+            self._stream.Close()
+        self._stream = None
+        self._dimension = None
+        self._cells = dict()
+        self._extent = None
+
+    def _Get(self, row: int, column: int):
+        if (row, column) in self._cells:
+            return self._cells[(row, column)]
+
+        return self._Block(row, column, row, column)[0][0]
+
+    def _Set(self, row: int, column: int, value):
+        if value == '':
+            value = None
+
+        self._cells[(row, column)] = value
+        if value is not None:
+            self._Extend(row, column)
+
+    def _Block(self, row: int, column: int, last_row: int, last_column: int) -> tuple:
+        if self._stream is None:
+            self._stream = RowStream(self._book._package, self._part)
+
+        rows = dict(self._stream.Rows(row, last_row))
+        overlay = self._cells
+
+        block = list()
+        for r in range(row, last_row + 1):
+            cells = rows.get(r, {})
+            block.append(tuple(overlay[(r, c)] if (r, c) in overlay else cells.get(c)
+                               for c in range(column, last_column + 1)))
+
+        return tuple(block)
+
+    def _Scan(self, row: int, column: int, last_row: int, last_column: int) -> list:
+        return self._ScanBlocks(row, column, last_row, last_column)
+
+    def _Used(self) -> tuple:
+        if self._dimension is None:
+            self._dimension = self._book._package.Dimension(self._part)
+
+        if self._extent is None:
+            return self._dimension
+
+        return tuple(f(a, b) for f, a, b in zip((min, min, max, max), self._dimension, self._extent))
+
+
+class RowStream(object):
+    """
+    Cursor on rows of a Worksheet in file. Reading rows in ascending order goes on from where the last read stops,
+    other reads start over from the beginning of Worksheet. Rows given by the last read are kept, so reading them
+    again, e.g. keys and then values in the same rows, does not start over.
+    """
+    def __init__(self, package: 'Package', part: str):
+        self._package = package
+        self._part = part
+        self._rows = None
+        self._ahead = None
+        self._last = 0
+        self._recent = (0, -1, dict())
+
+    def Close(self):
+        if self._rows:
+            self._rows.close()
+        self._rows = None
+        self._ahead = None
+        self._last = 0
+        self._recent = (0, -1, dict())
+
+    def Rows(self, first: int, last: int):
+        """
+        Rows in range
+        :param first: first row number
+        :param last: last row number
+        :return: list of (row number, {column: value}), only rows in file are given
+        """
+        top, bottom, recent = self._recent
+        if top <= first and last <= bottom:
+            return [(r, recent[r]) for r in range(first, last + 1) if r in recent]
+
+        if self._rows is None or first <= self._last:
+            self.Close()
+            self._rows = self._package.ReadRows(self._part)
+
+        rows = list()
+        while True:
+            if self._ahead:
+                row, self._ahead = self._ahead, None
+            else:
+                row = next(self._rows, None)
+                if row is None:
+                    break
+
+            if row[0] > last:
+                self._ahead = row
+                break
+
+            if row[0] >= first:
+                rows.append(row)
+
+        self._last = last
+        self._recent = (first, last, dict(rows))
+        return rows
+
+
+class Package(object):
+    """
+    The zip container of workbook, with the parts shared by Worksheets: shared strings and date styles
+    """
+    def __init__(self, file_name: str):
+        self._file_name = file_name
+        self._zip = zipfile.ZipFile(file_name)
+
+        names = set(self._zip.namelist())
+        workbook = _Target('', self._Relationships('_rels/.rels'), '/officeDocument')
+        relationships = self._Relationships(_RelsOf(workbook))
+
+        root = fromstring(self._zip.read(workbook))
+        properties = root.find('{%s}workbookPr' % _MAIN_)
+        if properties is not None and properties.get('date1904') in ('1', 'true'):
+            self._epoch = datetime(1904, 1, 1)
+        else:
+            self._epoch = datetime(1899, 12, 30)
+
+        folder = posixpath.dirname(workbook)
+        self.Sheets = list()
+        for sheet in root.iter('{%s}sheet' % _MAIN_):
+            target = relationships[sheet.get('{%s}id' % _RELATIONSHIP_)][1]
+            self.Sheets.append((sheet.get('name'), _Resolve(folder, target)))
+
+        strings = _Target(folder, relationships, '/sharedStrings')
+        self._strings = self._SharedStrings(strings) if strings in names else []
+
+        styles = _Target(folder, relationships, '/styles')
+        self._dates = self._DateStyles(styles) if styles in names else frozenset()
+
+    def Close(self):
+        self._zip.close()
+
+    def _Relationships(self, part: str) -> dict:
+        if part not in self._zip.namelist():
+            return dict()
+
+        root = fromstring(self._zip.read(part))
+        return dict((r.get('Id'), (r.get('Type'), r.get('Target'))) for r in root.iter('{%s}Relationship' % _PACKAGE_))
+
+    def _SharedStrings(self, part: str) -> list:
+        strings = list()
+        with self._zip.open(part) as fp:
+            for event, elem in iterparse(fp):
+                if elem.tag == '{%s}si' % _MAIN_:
+                    strings.append(_Text(elem))
+                    elem.clear()
+
+        return strings
+
+    def _DateStyles(self, part: str) -> frozenset:
+        root = fromstring(self._zip.read(part))
+
+        formats = dict()
+        for fmt in root.iter('{%s}numFmt' % _MAIN_):
+            code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', fmt.get('formatCode', ''))
+            formats[int(fmt.get('numFmtId'))] = bool(re.search(r'[dmyhs]', code, re.IGNORECASE))
+
+        xfs = root.find('{%s}cellXfs' % _MAIN_)
+        if xfs is None:
+            return frozenset()
+
+        dates = set()
+        for i, xf in enumerate(xfs.iter('{%s}xf' % _MAIN_)):
+            fmt = int(xf.get('numFmtId', 0))
+            if formats.get(fmt, fmt in _DATE_FORMATS_):
+                dates.add(i)
+
+        return frozenset(dates)
+
+    def Value(self, cell: Element):
+        """
+        Value of cell element, in the types that com object returns: float for numbers, datetime in UTC for dates
+        and int for errors, see emulator.ErrorValue
+        """
+        kind = cell.get('t', 'n')
+        if kind == 'inlineStr':
+            inline = cell.find(_INLINE_)
+            return None if inline is None else _Text(inline)
+
+        v = cell.find(_VALUE_)
+        if v is None or v.text is None:
+            return None
+
+        if kind == 's':
+            return self._strings[int(v.text)]
+
+        if kind == 'b':
+            return v.text == '1'
+
+        if kind == 'str':
+            return v.text
+
+        if kind == 'e':
+            return emulator.ErrorValue(_ERRORS_[v.text]) if v.text in _ERRORS_ else v.text
+
+        number = float(v.text)
+        if int(cell.get('s', 0)) in self._dates:
+            return (self._epoch + timedelta(days=number)).replace(tzinfo=timezone.utc)
+
+        return number
+
+    def ReadRows(self, part: str):
+        """
+        Stream rows of Worksheet. Rows are cut out from the raw text by chunks, and each chunk is parsed at once, so
+        that only a chunk of rows is held in memory.
+        :param part: part name of Worksheet in zip
+        :return: Generator of (row number, {column: value})
+        """
+        with self._zip.open(part) as fp:
+            declarations = ''
+            number = 0
+            for kind, _, text in _Scan(fp, split=False):
+                if kind == 'head':
+                    declarations = _Declarations(text)[0]
+                    continue
+
+                if kind == 'tail':
+                    return
+
+                if kind != 'rows':
+                    continue
+
+                for row in fromstring('<root {0}>{1}</root>'.format(declarations, text)):
+                    number = int(row.get('r') or number + 1)
+                    cells = dict()
+                    column = 0
+                    for cell in row.iter(_CELL_):
+                        ref = cell.get('r')
+                        column = _Column(ref) if ref else column + 1
+                        value = self.Value(cell)
+                        if value is not None:
+                            cells[column] = value
+
+                    yield number, cells
+
+    def Dimension(self, part: str) -> tuple:
+        """
+        Used range of Worksheet, given by dimension element, or by scanning all rows when there is no dimension
+        :return: (row, column, last row, last column)
+        """
+        with self._zip.open(part) as fp:
+            for event, elem in iterparse(fp, events=('start', 'end')):
+                if event == 'end' and elem.tag == _DIMENSION_:
+                    addr = Address(addr=elem.get('ref').split(',')[0])
+                    return addr.Row, addr.Column, addr.Row + addr.RowCount - 1, addr.Column + addr.ColumnCount - 1
+
+                if event == 'start' and elem.tag == _SHEET_DATA_:
+                    break
+
+        extent = None
+        for row, cells in self.ReadRows(part):
+            if not cells:
+                continue
+            area = (row, min(cells), row, max(cells))
+            extent = area if extent is None else tuple(f(a, b) for f, a, b in zip((min, min, max, max), extent, area))
+
+        return extent or (1, 1, 1, 1)
+
+    def Save(self, file_name: str, overlays: dict):
+        """
+        Write the package to file, with values in overlays merged into Worksheets. Parts not changed are copied as
+        they are. Calculation chain is dropped when any value is written, Excel rebuilds it on loading.
+        :param file_name: path of file
+        :param overlays: {part name: {(row, column): value}}
+        :return: None
+        """
+        temp = file_name + '.saving'
+        with zipfile.ZipFile(temp, 'w', zipfile.ZIP_DEFLATED) as out:
+            for info in self._zip.infolist():
+                name = info.filename
+                if overlays and name.endswith('calcChain.xml'):
+                    continue
+
+                target = zipfile.ZipInfo(name, date_time=info.date_time)
+                target.compress_type = info.compress_type
+                target.external_attr = info.external_attr
+
+                with out.open(target, 'w', force_zip64=True) as dst:
+                    if name in overlays:
+                        for text in self._Merge(name, overlays[name]):
+                            dst.write(text.encode('utf-8'))
+                    elif overlays and (name == '[Content_Types].xml' or name.endswith('.rels')):
+                        text = self._zip.read(name).decode('utf-8')
+                        dst.write(_CALC_CHAIN_.sub('', text).encode('utf-8'))
+                    else:
+                        with self._zip.open(info) as src:
+                            shutil.copyfileobj(src, dst, _CHUNK_)
+
+        if os.path.abspath(file_name) == self._file_name:
+            self._zip.close()
+        os.replace(temp, file_name)
+
+    def _Merge(self, part: str, overlay: dict):
+        """
+        Stream Worksheet xml with overlay merged. Rows are cut out from the raw text, rows not in overlay are written
+        as they are, only rows changed are parsed and rebuilt.
+        """
+        rows = dict()
+        for (r, c), value in overlay.items():
+            rows.setdefault(r, dict())[c] = value
+        pending = sorted(rows)
+        k = 0
+
+        prefixes = {}
+        declarations = ''
+        with self._zip.open(part) as fp:
+            for kind, number, text in _Scan(fp):
+                if kind == 'head':
+                    declarations, prefixes = _Declarations(text)
+                    yield _Dimension(text, overlay)
+                    continue
+
+                if kind == 'row':
+                    while k < len(pending) and pending[k] < number:
+                        yield _NewRow(pending[k], rows[pending[k]], prefixes, self._epoch)
+                        k += 1
+
+                    if k < len(pending) and pending[k] == number:
+                        yield _MergeRow(text, rows[number], declarations, prefixes, self._epoch)
+                        k += 1
+                    else:
+                        yield text
+                    continue
+
+                if kind == 'tail':
+                    while k < len(pending):
+                        yield _NewRow(pending[k], rows[pending[k]], prefixes, self._epoch)
+                        k += 1
+
+                yield text
+
+
+def _Scan(fp, split: bool = True):
+    """
+    Cut Worksheet xml into raw text pieces:
+        ('head', None, text)    - everything before rows, ends with start tag of sheetData
+        ('row', number, text)   - a row element
+        ('rows', None, text)    - rows in a chunk, when not split into rows
+        ('text', None, text)    - blanks between rows, and everything after rows
+        ('tail', None, text)    - end tag of sheetData
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buf, pos = '', 0
+
+    def fill():
+        nonlocal buf, pos
+        chunk = fp.read(_CHUNK_)
+        buf = buf[pos:] + decoder.decode(chunk, final=not chunk)
+        pos = 0
+        return bool(chunk)
+
+    head = _HEAD_.search(buf)
+    while head is None:
+        if not fill():
+            raise XlError('No sheetData in worksheet.')
+        head = _HEAD_.search(buf)
+
+    prefix = head.group(1) or ''
+    if head.group(2):
+        yield 'head', None, buf[:head.start()] + '<{0}sheetData>'.format(prefix)
+        yield 'tail', None, '</{0}sheetData>'.format(prefix)
+        yield 'text', None, buf[head.end():]
+        while fill():
+            yield 'text', None, buf
+        return
+
+    yield 'head', None, buf[:head.end()]
+    pos = head.end()
+
+    opening, closing, tail = '<{0}row'.format(prefix), '</{0}row>'.format(prefix), '</{0}sheetData>'.format(prefix)
+    number = 0
+    while True:
+        # Rows before the last row started in buffer are complete
+        end = buf.find(tail, pos)
+        limit = end if end >= 0 else buf.rfind(opening, pos)
+
+        if limit > pos and not split:
+            yield 'rows', None, buf[pos:limit]
+            pos = limit
+
+        while pos < limit:
+            start = buf.find(opening, pos, limit)
+            if start < 0:
+                yield 'text', None, buf[pos:limit]
+                pos = limit
+                break
+
+            if start > pos:
+                yield 'text', None, buf[pos:start]
+
+            stop = buf.find('>', start)
+            found = _ROW_NUMBER_.search(buf, start, stop)
+            number = int(found.group(1)) if found else number + 1
+            stop = stop + 1 if buf[stop - 1] == '/' else buf.find(closing, stop) + len(closing)
+
+            yield 'row', number, buf[start:stop]
+            pos = stop
+
+        if end >= 0:
+            yield 'tail', None, tail
+            yield 'text', None, buf[end + len(tail):]
+            pos = len(buf)
+            while fill():
+                yield 'text', None, buf
+                pos = len(buf)
+            return
+
+        if not fill():
+            raise XlError('Worksheet xml is broken.')
+
+
+def _Declarations(head: str) -> (str, dict):
+    """
+    Namespace declarations on root of Worksheet, rows cut out from Worksheet are parsed and written with them
+    :return: (declarations in text, {namespace: prefix})
+    """
+    root = _ROOT_.search(head)
+    if root is None:
+        raise XlError('No worksheet in worksheet xml.')
+
+    declarations = ' '.join(m.group(0) for m in _NAMESPACE_.finditer(root.group(1)))
+    prefixes = dict((m.group(2), m.group(1) or '') for m in _NAMESPACE_.finditer(root.group(1)))
+    prefixes[_XML_] = 'xml'
+    return declarations, prefixes
+
+
+def _Dimension(head: str, overlay: dict) -> str:
+    """
+    Extend dimension in head to cover cells written
+    """
+    cells = [cell for cell, value in overlay.items() if value is not None]
+    found = _DIMENSION_TEXT_.search(head)
+    if not cells or not found:
+        return head
+
+    addr = Address(addr=found.group(2).split(',')[0])
+    rows, columns = [c[0] for c in cells], [c[1] for c in cells]
+    ref = Encode((min(addr.Row, min(rows)), min(addr.Column, min(columns))),
+                 (max(addr.Row + addr.RowCount - 1, max(rows)), max(addr.Column + addr.ColumnCount - 1, max(columns))))
+
+    return head[:found.start(2)] + ref + head[found.end(2):]
+
+
+def _MergeRow(text: str, cells: dict, declarations: str, prefixes: dict, epoch: datetime) -> str:
+    row = fromstring('<root {0}>{1}</root>'.format(declarations, text))[0]
+    row.attrib.pop('spans', None)
+
+    existing = dict()
+    others = list()
+    column = 0
+    for child in list(row):
+        row.remove(child)
+        if child.tag == _CELL_:
+            ref = child.get('r')
+            column = _Column(ref) if ref else column + 1
+            existing[column] = child
+        else:
+            others.append(child)
+
+    number = int(row.get('r'))
+    for column, value in cells.items():
+        if value is None:
+            existing.pop(column, None)
+            continue
+
+        if column not in existing:
+            existing[column] = Element(_CELL_)
+        _Fill(existing[column], number, column, value, epoch)
+
+    for column in sorted(existing):
+        if existing[column].get('r') is None:
+            existing[column].set('r', Encode((number, column)))
+        row.append(existing[column])
+    row.extend(others)
+
+    return _Serialize(row, prefixes)
+
+
+def _NewRow(number: int, cells: dict, prefixes: dict, epoch: datetime) -> str:
+    row = Element(_ROW_, r=str(number))
+    for column in sorted(cells):
+        if cells[column] is not None:
+            _Fill(SubElement(row, _CELL_), number, column, cells[column], epoch)
+
+    return _Serialize(row, prefixes)
+
+
+def _Fill(cell: Element, row: int, column: int, value, epoch: datetime):
+    """
+    Set value into cell element, style of cell is kept. Dates are written as serial numbers from epoch of Workbook,
+    in the time they show, as Excel has no time zone
+    """
+    style = cell.get('s')
+    cell.clear()
+    cell.set('r', Encode((row, column)))
+    if style is not None:
+        cell.set('s', style)
+
+    if isinstance(value, bool):
+        cell.set('t', 'b')
+        SubElement(cell, _VALUE_).text = '1' if value else '0'
+    elif isinstance(value, (int, float)):
+        SubElement(cell, _VALUE_).text = repr(value)
+    elif isinstance(value, (datetime, date)):
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        SubElement(cell, _VALUE_).text = repr((value.replace(tzinfo=None) - epoch) / timedelta(days=1))
+    else:
+        cell.set('t', 'inlineStr')
+        text = SubElement(SubElement(cell, _INLINE_), _TEXT_)
+        text.text = str(value)
+        if text.text != text.text.strip():
+            text.set('{%s}space' % _XML_, 'preserve')
+
+
+def _Serialize(elem: Element, prefixes: dict) -> str:
+    parts = ['<', _Name(elem.tag, prefixes)]
+    for key, value in elem.attrib.items():
+        parts.append(' {0}="{1}"'.format(_Name(key, prefixes), escape(value, {'"': '&quot;'})))
+
+    if not len(elem) and elem.text is None:
+        parts.append('/>')
+        return ''.join(parts)
+
+    parts.append('>')
+    if elem.text:
+        parts.append(escape(elem.text))
+    for child in elem:
+        parts.append(_Serialize(child, prefixes))
+        if child.tail:
+            parts.append(escape(child.tail))
+    parts.extend(('</', _Name(elem.tag, prefixes), '>'))
+
+    return ''.join(parts)
+
+
+def _Name(tag: str, prefixes: dict) -> str:
+    if tag[0] != '{':
+        return tag
+
+    uri, local = tag[1:].split('}')
+    if uri not in prefixes:
+        raise XlError('Namespace {0} is not declared in worksheet.'.format(uri))
+
+    return prefixes[uri] + ':' + local if prefixes[uri] else local
+
+
+def _Text(elem: Element) -> str:
+    """
+    Text of shared string or inline string, phonetic runs are skipped
+    """
+    parts = list()
+    for child in elem:
+        if child.tag == _TEXT_:
+            parts.append(child.text or '')
+        elif child.tag == _RUN_:
+            t = child.find(_TEXT_)
+            if t is not None:
+                parts.append(t.text or '')
+
+    return ''.join(parts)
+
+
+def _Column(ref: str) -> int:
+    return Letter2Int26(ref.rstrip('0123456789'))
+
+
+def _RelsOf(part: str) -> str:
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, '_rels', name + '.rels')
+
+
+def _Resolve(folder: str, target: str) -> str:
+    if target.startswith('/'):
+        return target[1:]
+
+    return posixpath.normpath(posixpath.join(folder, target))
+
+
+def _Target(folder: str, relationships: dict, kind: str) -> str or None:
+    for rel_type, target in relationships.values():
+        if rel_type.endswith(kind):
+            return _Resolve(folder, target)
+
+    return None